@@ -11,3 +11,15 @@ with open(config_file, 'r') as file:
 log_file = config['logging'].get('log_file', 'logs/system.log')  # Default log file path
 log_level_str = config['logging'].get('log_level', 'INFO')  # Default log level
 api_key = config.get("groq_api_key")
+
+# LLM settings (optional "llm" section of config.json)
+llm_config = config.get("llm", {})
+llm_model = llm_config.get("model", "llama3-8b-8192")
+llm_timeout_seconds = float(llm_config.get("timeout_seconds", 20))  # Per-completion timeout
+llm_max_retries = int(llm_config.get("max_retries", 1))
+llm_cache_path = llm_config.get("cache_path", "cache/llm_cache.json")  # LLM response cache file, relative to the working directory
+llm_cache_ttl_seconds = int(llm_config.get("cache_ttl_seconds", 86400))
+llm_cache_max_entries = int(llm_config.get("cache_max_entries", 1000))
+llm_cache_similarity = float(llm_config.get("cache_similarity_threshold", 0.9))
+few_shot_examples_path = llm_config.get("examples_path", "configs/few_shot_examples.json")  # Question/query pairs written against mongo_schemas
+few_shot_k = int(llm_config.get("few_shot_k", 2))  # Examples per prompt, all from the question's collection
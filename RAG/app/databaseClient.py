@@ -6,6 +6,7 @@ from bson import ObjectId
 from fastapi import HTTPException
 import re
 import ast
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.logging_config import configure_logger
 
@@ -22,6 +23,15 @@ class JSONEncoder(json.JSONEncoder):
 class MongoDBClient:
     CONFIG_PATH = "configs/config.json"  # Default config file path
 
+    # Pool settings, overridable in the "mongodb" section of config.json
+    POOL_DEFAULTS = {
+        "maxPoolSize": 20,
+        "minPoolSize": 2,
+        "maxIdleTimeMS": 300000,
+        "connectTimeoutMS": 5000,
+        "serverSelectionTimeoutMS": 5000,
+    }
+
     def __init__(self):
         """
         Initialize MongoDBClient by reading credentials from a default config file.
@@ -30,6 +40,7 @@ class MongoDBClient:
         self.config = self._load_config()
         self.client = None
         self.db = None
+        self._connect_lock = asyncio.Lock()
         logger.info(f"Exiting function MongoDBClient.__init__")
 
     def _load_config(self) -> dict:
@@ -43,12 +54,15 @@ class MongoDBClient:
     async def connect(self):
         logger.info(f"Starting function MongoDBClient.connect")
         logger.info(f"Trying to establish database connection")
+        # The client (and its connection pool) lives until close(), shared by all requests
+        pool_options = {key: self.config.get(key, default) for key, default in self.POOL_DEFAULTS.items()}
+
         # Check if a connection URL is provided
         connection_url = self.config.get("connection_url")
 
         if connection_url:
             # If connection URL exists, use it to connect
-            self.client = AsyncIOMotorClient(connection_url)
+            self.client = AsyncIOMotorClient(connection_url, **pool_options)
         else:
             # Otherwise, fall back to using host, port, and other parameters
             self.client = AsyncIOMotorClient(
@@ -57,11 +71,38 @@ class MongoDBClient:
                 username=self.config.get("username"),
                 password=self.config.get("password"),
                 authSource=self.config.get("authSource", "admin"),
+                **pool_options,
             )
         self.db = self.client[self.config["database"]]
         logger.info(f"Database connection success")
         logger.info(f"Exiting function MongoDBClient.connect")
 
+    async def ensure_connected(self):
+        """Connect once; concurrent callers wait for the same connection."""
+        if self.client:
+            return
+        async with self._connect_lock:
+            if not self.client:
+                await self.connect()
+
+    async def warm_up(self):
+        """Run a ping so server discovery and the first pooled sockets are set up before traffic arrives."""
+        logger.info(f"Starting function MongoDBClient.warm_up")
+        await self.ensure_connected()
+        await self.db.command("ping")
+        logger.info(f"Exiting function MongoDBClient.warm_up")
+
+    async def is_ready(self, timeout: float = 2.0) -> bool:
+        """True when the database answers a ping within timeout seconds."""
+        if not self.client:
+            return False
+        try:
+            await asyncio.wait_for(self.db.command("ping"), timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MongoDB readiness check failed: {e}")
+            return False
+
     async def execute_query(self, query: Union[dict, str]) -> Dict[str, Any]:
         """
         Execute a query on all collections in the database or a specific collection.
@@ -70,8 +111,7 @@ class MongoDBClient:
         """
         logger.info(f"Starting function MongoDBClient.execute_query")
 
-        if not self.client:
-            await self.connect()
+        await self.ensure_connected()
 
         results = []
         target_collection = None
@@ -122,8 +162,6 @@ class MongoDBClient:
                         results.extend(collection_results)
         except Exception as e:
             results = [{"error": str(e)}]
-        finally:
-            await self.close()
 
         # Wrap the results in a dictionary with the key "results"
         final_output = {"results": results}
@@ -131,6 +169,19 @@ class MongoDBClient:
         logger.info(f"Exiting function MongoDBClient.execute_query: {final_output}")
         return json.loads(json.dumps(final_output, cls=JSONEncoder))
 
+    async def aggregate(self, collection: str, pipeline: list) -> Dict[str, Any]:
+        """
+        Run an aggregation pipeline on one collection.
+        :return: Dictionary of results in the format {"results": [...]}.
+        """
+        logger.info(f"Starting function MongoDBClient.aggregate on {collection}")
+        await self.ensure_connected()
+        try:
+            results = await self.db[collection].aggregate(pipeline).to_list(length=None)
+        except Exception as e:
+            results = [{"error": str(e)}]
+        return json.loads(json.dumps({"results": results}, cls=JSONEncoder))
+
     async def close(self):
         logger.info(f"Starting function MongoDBClient.close")
         """Close the MongoDB connection."""
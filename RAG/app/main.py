@@ -1,4 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from models.codelama import (
@@ -10,6 +13,8 @@ from models.codelama import (
 )
 from app.databaseClient import MongoDBClient
 from app.responseEngine import responseGeneration
+from models.codelama import response_cache
+from app.metrics import path_latency
 import re
 from app.logging_config import configure_logger  # Import the logging configuration
 
@@ -17,11 +22,27 @@ from app.logging_config import configure_logger  # Import the logging configurat
 logger = configure_logger()
 db_client = MongoDBClient()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared MongoDB pool at startup and close it at shutdown."""
+    await db_client.connect()
+    try:
+        await db_client.warm_up()
+    except Exception as e:
+        # Keep serving; /ready reports the database as unavailable until it answers
+        logger.error(f"MongoDB warm-up failed: {e}")
+    yield
+    await db_client.close()
+    await asyncio.to_thread(response_cache.save)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="MongoDB Query Generator API",
     description="Generate MongoDB queries based on user questions",
     version="1.0",
+    lifespan=lifespan,
 )
 
 # Allow all origins (for development only)
@@ -55,6 +76,25 @@ async def generate_query(request: QueryRequest):
     return await responseGeneration(db_client, request.question)
 
 
+@app.get("/ready", summary="Readiness Probe")
+async def ready():
+    """
+    Readiness probe: 200 when MongoDB answers a ping, 503 otherwise.
+    """
+    if await db_client.is_ready():
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "unavailable"})
+
+
+@app.get("/metrics", summary="Service Metrics")
+async def metrics():
+    """
+    LLM response cache hit rates, and request counts with p50/p99 latency
+    for the template fast path versus the LLM path.
+    """
+    return {"llm_cache": response_cache.stats(), "paths": path_latency.stats()}
+
+
 @app.post("/generate_response", summary="Generate Natural Language Response")
 async def generate_responses(request: QueryRequest):
     """
@@ -0,0 +1,27 @@
+from collections import deque
+
+import numpy as np
+
+
+class PathLatency:
+    """Request counts and p50/p99 latency per answer path, over the last window requests."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.counts = {}
+        self.samples = {}
+
+    def record(self, path, seconds):
+        self.counts[path] = self.counts.get(path, 0) + 1
+        self.samples.setdefault(path, deque(maxlen=self.window)).append(seconds * 1000.0)
+
+    def stats(self):
+        stats = {}
+        for path, samples in self.samples.items():
+            p50, p99 = np.percentile(np.fromiter(samples, dtype=float), [50, 99])
+            stats[path] = {"count": self.counts[path], "p50_ms": round(float(p50), 1), "p99_ms": round(float(p99), 1)}
+        return stats
+
+
+# Shared by every request of the service
+path_latency = PathLatency()
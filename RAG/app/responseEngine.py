@@ -8,7 +8,10 @@ from models.codelama import (
     is_generic_question,
 )
 from app.databaseClient import MongoDBClient
+from app.metrics import path_latency
+from app.templateEngine import default_engine
 import re
+import time
 from app.logging_config import configure_logger  # Import the logging configuration
 
 # Get the logger from the logging configuration module
@@ -44,8 +47,37 @@ def is_read_only_query(query: str) -> bool:
     return True
 
 
+async def templateResponse(db_client: MongoDBClient, question: str):
+    """
+    Answer from a parameterized pipeline without calling the LLM.
+    Returns None when no template matches the question, the pipeline fails
+    or its results can't answer it, so the LLM path handles the question.
+    """
+    template = default_engine.match(question)
+    if template is None:
+        return None
+    logger.info(f"Answering with query template {template.name}")
+    try:
+        query_result = await db_client.aggregate(template.collection, template.pipeline)
+    except Exception as e:
+        logger.error(f"Query template {template.name} failed, falling back to the LLM: {e}")
+        return None
+    results = query_result["results"]
+    if results and "error" in results[0]:
+        logger.error(f"Query template {template.name} failed, falling back to the LLM: {results[0]['error']}")
+        return None
+    return template.render(results)
+
+
 async def responseGeneration(db_client: MongoDBClient, question: str):
+    started = time.perf_counter()
     try:
+        # Common questions are answered from templates; Groq is only called when none matches
+        template_output = await templateResponse(db_client, question)
+        if template_output is not None:
+            path_latency.record("template", time.perf_counter() - started)
+            return template_output
+
         # Check if it's a general or MongoDB-specific question
         if is_generic_question(question):
             logger.info("Processing as a natural language response")
@@ -55,7 +87,7 @@ async def responseGeneration(db_client: MongoDBClient, question: str):
             return {"response": response}
 
         logger.info("Processing as a MongoDB query request")
-        mongo_query = generate_mongo_query_with_schema(question)
+        mongo_query = await generate_mongo_query_with_schema(question)
 
         # Validate the generated query
         if not mongo_query or "Error:" in mongo_query:
@@ -72,6 +104,7 @@ async def responseGeneration(db_client: MongoDBClient, question: str):
         query_result = await db_client.execute_query(mongo_query)
         nlp_output = await generate_natural_lang_response(question, query_result)
 
+        path_latency.record("llm", time.perf_counter() - started)
         return nlp_output
 
     except Exception as e:
@@ -0,0 +1,147 @@
+import re
+from typing import Callable, List, NamedTuple, Optional
+
+# A name word; query words mean the question is not about a person, so the LLM handles it
+WORD = r"(?!(?:and|on|where|with|whose|status|invoices?|users?|schedules?)\b)[a-z][a-z.'-]*"
+NAME = rf"{WORD}(?: {WORD}){{0,3}}"
+# One or more names: "alice", "alice and bob", "alice, bob"
+NAMES = rf"(?P<names>{NAME}(?:(?:,| and) *{NAME})*)"
+
+
+def split_names(names: str) -> List[str]:
+    """Lowercase names from "a, b and c", compared with lowercased names in the database."""
+    return [name.strip() for name in re.split(r",| and ", names) if name.strip()]
+
+
+class TemplateMatch(NamedTuple):
+    name: str
+    collection: str
+    pipeline: list
+    render: Callable[[list], str]
+
+
+class Template(NamedTuple):
+    name: str
+    pattern: "re.Pattern"
+    collection: str
+    build: Callable[[dict], list]
+    render: Callable[[dict, list], str]
+
+
+class TemplateEngine:
+    """
+    Maps questions to parameterized aggregation pipelines with compiled regexes.
+    Templates are tried in registration order; the first full match wins.
+    """
+
+    def __init__(self):
+        self.templates: List[Template] = []
+
+    def register(self, name, pattern, collection, build, render):
+        """build(params) returns the pipeline and render(params, results) the answer text,
+        or None when the results can't answer the question and the LLM should."""
+        self.templates.append(Template(name, re.compile(pattern), collection, build, render))
+
+    def match(self, question: str) -> Optional[TemplateMatch]:
+        normalized = " ".join(question.lower().split()).strip(" ?.!")
+        for template in self.templates:
+            found = template.pattern.fullmatch(normalized)
+            if found:
+                params = found.groupdict()
+                return TemplateMatch(
+                    template.name,
+                    template.collection,
+                    template.build(params),
+                    lambda results, template=template, params=params: template.render(params, results),
+                )
+        return None
+
+
+def name_match(name_expression, params):
+    """$match on a lowercased name expression being one of the asked-for names."""
+    return {"$match": {"$expr": {"$in": [{"$toLower": name_expression}, split_names(params["names"])]}}}
+
+
+def total_hours_pipeline(params):
+    # users.first_name + last_name -> invoices.faculty_id
+    return [
+        name_match({"$concat": ["$first_name", " ", "$last_name"]}, params),
+        {"$lookup": {"from": "invoices", "localField": "_id", "foreignField": "faculty_id", "as": "invoices"}},
+        {"$project": {
+            "_id": 0, "first_name": 1, "last_name": 1,
+            "totalHours": {"$sum": "$invoices.total_hours_worked"},
+            "invoiceCount": {"$size": "$invoices"},
+        }},
+        {"$sort": {"first_name": 1, "last_name": 1}},
+    ]
+
+
+def render_total_hours(params, results):
+    if not results:
+        return None
+    return "\n".join(
+        f"Total hours for {row['first_name']} {row['last_name']}: {row['totalHours']:g} "
+        f"({row['invoiceCount']} invoice{'' if row['invoiceCount'] == 1 else 's'})"
+        for row in results
+    )
+
+
+def courses_pipeline(params):
+    return [
+        name_match("$instructor", params),
+        {"$group": {"_id": {"instructor": "$instructor", "course_code": "$course_code"}}},
+        {"$project": {"_id": 0, "instructor": "$_id.instructor", "course_code": "$_id.course_code"}},
+        {"$sort": {"instructor": 1, "course_code": 1}},
+    ]
+
+
+def render_courses(params, results):
+    if not results:
+        return None
+    courses = {}
+    for row in results:
+        courses.setdefault(row["instructor"], []).append(row["course_code"])
+    return "\n".join(f"{instructor}: {', '.join(codes)}" for instructor, codes in courses.items())
+
+
+def status_count_pipeline(params):
+    return [{"$match": {"status": params["status"]}}, {"$count": "count"}]
+
+
+def render_status_count(params, results):
+    count = results[0]["count"] if results else 0
+    noun = params["noun"]
+    return f"There {'is' if count == 1 else 'are'} {count} {params['status']} {noun if count == 1 else noun + 's'}."
+
+
+def status_breakdown_pipeline(params):
+    return [{"$group": {"_id": "$status", "count": {"$sum": 1}}}, {"$sort": {"_id": 1}}]
+
+
+def render_status_breakdown(params, results):
+    if not results:
+        return f"No {params['noun']}s found."
+    return "\n".join(f"{row['_id']}: {row['count']}" for row in results)
+
+
+default_engine = TemplateEngine()
+default_engine.register(
+    "total_hours", rf"(?:what (?:is|are) the )?(?:total|working) hours (?:for|of|by) {NAMES}",
+    "users", total_hours_pipeline, render_total_hours,
+)
+default_engine.register(
+    "courses", rf"(?:what |which |list )?(?:the )?courses?(?: codes?)? (?:for|of|taught by|by) {NAMES}",
+    "schedule", courses_pipeline, render_courses,
+)
+default_engine.register(
+    "invoice_status_count", r"(?:how many|count(?: the number of)?|(?:get )?the (?:total )?number of) (?P<status>pending|approved|rejected) (?P<noun>invoice)s?(?: are there)?",
+    "invoices", status_count_pipeline, render_status_count,
+)
+default_engine.register(
+    "user_status_count", r"(?:how many|count(?: the number of)?|(?:get )?the (?:total )?number of) (?P<status>active|inactive) (?P<noun>user)s?(?: are there)?",
+    "users", status_count_pipeline, render_status_count,
+)
+default_engine.register(
+    "invoice_status_breakdown", r"(?:count|how many) (?P<noun>invoice)s? (?:per|by) status",
+    "invoices", status_breakdown_pipeline, render_status_breakdown,
+)
@@ -1,12 +1,20 @@
 import os
 import re
+import json
+import asyncio
 import logging
-from groq import Groq
+from groq import AsyncGroq, Groq
 from requests.exceptions import RequestException
 from requests.exceptions import RequestException
 import requests
 from app.logging_config import configure_logger
-from app.config import api_key
+from app.config import (
+    api_key, llm_model, llm_timeout_seconds, llm_max_retries,
+    llm_cache_path, llm_cache_ttl_seconds, llm_cache_max_entries, llm_cache_similarity,
+    few_shot_examples_path, few_shot_k,
+)
+from models.llm_cache import ResponseCache
+from models.few_shot import FewShotIndex, format_examples
 
 
 # Get the logger from the logging configuration module
@@ -19,6 +27,42 @@ if not api_key:
 
 client = Groq(api_key=api_key)
 
+# Non-blocking client for the request path, so a slow completion doesn't stall the event loop
+async_client = AsyncGroq(api_key=api_key, timeout=llm_timeout_seconds, max_retries=llm_max_retries)
+
+
+# Exact + similarity cache of LLM outputs, persisted across restarts
+response_cache = ResponseCache(
+    llm_cache_path,
+    max_entries=llm_cache_max_entries,
+    ttl_seconds=llm_cache_ttl_seconds,
+    similarity_threshold=llm_cache_similarity,
+)
+
+
+async def cache_put(question, value, context):
+    """Cache an LLM output; the periodic save runs in a worker thread, off the event loop."""
+    if response_cache.put(question, value, context):
+        await asyncio.to_thread(response_cache.save)
+
+
+# Example question/query pairs, indexed once at import
+few_shot_index = FewShotIndex.from_file(few_shot_examples_path)
+logger.info(f"Indexed {len(few_shot_index.pairs)} few-shot examples from {few_shot_examples_path}")
+
+
+async def complete(prompt, timeout=llm_timeout_seconds):
+    """Run one chat completion on the async client and return its text.
+    The call is cancelled and asyncio.TimeoutError raised after timeout seconds."""
+    chat_completion = await asyncio.wait_for(
+        async_client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=llm_model,
+        ),
+        timeout,
+    )
+    return chat_completion.choices[0].message.content
+
 # Define MongoDB collection schemas
 mongo_schemas = {
     "users": """
@@ -57,14 +101,18 @@ mongo_schemas = {
     """
 }
 
+# Collection a question is about: the first one it names (e.g. "invoice", "schedules"), otherwise users
+def detect_collection(question):
+    question_lower = question.lower()
+    for collection in mongo_schemas:
+        if collection.rstrip("s") in question_lower:
+            return collection
+    return "users"
+
 # Function to detect the relevant schema based on user question
 def detect_relevant_schema(question):
     try:
-        question_lower = question.lower()
-        for collection, schema in mongo_schemas.items():
-            if any(keyword in question_lower for keyword in schema.lower().split("\n")):
-                return schema
-        return None
+        return mongo_schemas[detect_collection(question)]
     except Exception as e:
         logger.error(f"Error detecting relevant schema: {e}")
         return None
@@ -151,38 +199,54 @@ def is_generic_question(question):
 
 # Function to generate natural language response based on whether the question is generic or specific
 async def generate_response(question):
+    cached = response_cache.get(question, "general")
+    if cached is not None:
+        return cached
+
     prompt = f"Question: {question}\nGenerate a general response to this question."
 
-    chat_completion = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama3-8b-8192",
-    )
-    
-    response = chat_completion.choices[0].message.content
+    try:
+        response = await complete(prompt)
+    except asyncio.TimeoutError:
+        logger.error("LLM request timed out while generating a general response")
+        return "Error: LLM request timed out."
+    await cache_put(question, response, "general")
     return response
 
 # Function to generate MongoDB query with dynamic schema selection
-def generate_mongo_query_with_schema(question):
+async def generate_mongo_query_with_schema(question):
     logger.info(f"Processing generate_mongo_query_with_schema with question: {question}")
     try:
+        cached = response_cache.get(question, "mongo_query")
+        if cached is not None:
+            logger.info(f"LLM cache hit for question: {question}")
+            return cached
+
         schema = detect_relevant_schema(question)
         if not schema:
             logger.error(f"No matching schema found for the question: {question}")
             return "Error: No matching schema found for the question."
         
         prompt = f"{schema}\nGenerate a MongoDB query for: {question}"
+
+        # Prepend the most similar known question/query pairs on the same collection
+        examples = few_shot_index.top_k(question, few_shot_k, detect_collection(question))
+        if examples:
+            prompt = f"{schema}\nExamples:\n{format_examples(examples)}\nGenerate a MongoDB query for: {question}"
         
         try:
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-8b-8192",
-            )
-            response = chat_completion.choices[0].message.content
+            response = await complete(prompt)
+        except asyncio.TimeoutError:
+            logger.error(f"LLM request timed out for question: {question}")
+            return "Error: LLM request timed out."
         except RequestException as e:
             logger.error(f"API request failed: {e}")
             return "Error: API request failed."
         
-        return extract_mongo_query(response)
+        mongo_query = extract_mongo_query(response)
+        if not mongo_query.startswith("Error"):
+            await cache_put(question, mongo_query, "mongo_query")
+        return mongo_query
     except Exception as e:
         logger.error(f"Error generating MongoDB query: {e}")
         return "Error: Unexpected error occurred."
@@ -203,15 +267,21 @@ def extract_mongo_query(response):
 # Function to generate natural language response
 async def generate_natural_lang_response(question, result):
     try:
+        # Answers are only reused for the same query result
+        context = "answer:" + json.dumps(result, sort_keys=True, default=str)
+        cached = response_cache.get(question, context)
+        if cached is not None:
+            return cached
+
         prompt = f"Question: {question}\nResult: {result}\nGenerate a natural language response based on the result.  Also remove any sensitive information from the resultset & any information related to ADMIN users(Do not mention about these santizations in the result)."
         
         try:
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-8b-8192",
-            )
-            response = chat_completion.choices[0].message.content
+            response = await complete(prompt)
+            await cache_put(question, response, context)
             return response
+        except asyncio.TimeoutError:
+            logger.error("LLM request timed out while generating natural language response")
+            return "Error: LLM request timed out."
         except RequestException as e:
             logger.error(f"API request failed while generating natural language response: {e}")
             return "Error: API request failed."
@@ -312,5 +382,5 @@ questions = [
 # ## Verification of code
 # for question in questions:
 #     logger.info(f"User Question: {question}")
-#     mongo_query = generate_mongo_query_with_schema(question)
+#     mongo_query = asyncio.run(generate_mongo_query_with_schema(question))
 #     logger.info(f"Generated Mongo Query: {mongo_query}")
@@ -0,0 +1,68 @@
+import json
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_$]+")
+# Collection an example query runs on, e.g. db.invoices.find(...) -> invoices
+COLLECTION_PATTERN = re.compile(r"db\.(\w+)\.")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class FewShotIndex:
+    """
+    BM25 index over question/query example pairs, built once in memory.
+    top_k() returns the examples most similar to a question, for few-shot prompts,
+    optionally only those whose query runs on a given collection.
+    """
+
+    def __init__(self, pairs, k1=1.5, b=0.75):
+        self.pairs = [pair for pair in pairs if pair.get("question") and pair.get("query")]
+        self.collections = []
+        for pair in self.pairs:
+            match = COLLECTION_PATTERN.search(pair["query"])
+            self.collections.append(match.group(1) if match else None)
+        documents = [tokenize(pair["question"]) for pair in self.pairs]
+        self.vocabulary = {term: index for index, term in enumerate(sorted({term for document in documents for term in document}))}
+
+        term_frequency = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, document in enumerate(documents):
+            for term in document:
+                term_frequency[row, self.vocabulary[term]] += 1.0
+
+        # Per-document BM25 term weights, so a query only sums the columns of its terms
+        lengths = term_frequency.sum(axis=1, keepdims=True)
+        average_length = float(lengths.mean()) if len(documents) else 0.0
+        document_frequency = np.count_nonzero(term_frequency, axis=0)
+        idf = np.log((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5) + 1.0)
+        norm = k1 * (1.0 - b + b * lengths / average_length) if average_length else k1
+        self.weights = (idf * term_frequency * (k1 + 1.0) / (term_frequency + norm)).astype(np.float32)
+
+    @classmethod
+    def from_file(cls, path):
+        """Index the [{"question": ..., "query": ...}] pairs of a JSON file; empty if it can't be read."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return cls(json.load(file))
+        except (OSError, ValueError):
+            return cls([])
+
+    def top_k(self, question, k=3, collection=None):
+        """Up to k (question, query) pairs with a positive BM25 score, best first.
+        With a collection, only pairs querying that collection are returned."""
+        columns = sorted({self.vocabulary[term] for term in tokenize(question) if term in self.vocabulary})
+        if not columns:
+            return []
+        scores = self.weights[:, columns].sum(axis=1)
+        if collection is not None:
+            scores = np.where([name == collection for name in self.collections], scores, 0.0)
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [(self.pairs[index]["question"], self.pairs[index]["query"]) for index in best if scores[index] > 0]
+
+
+def format_examples(examples):
+    """Prompt section listing example questions with their queries."""
+    return "\n".join(f"Q: {question}\nA: {query}" for question, query in examples)
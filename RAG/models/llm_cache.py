@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9@._'-]+")
+# Quoted strings and numbers/dates must be identical for a similarity hit,
+# so "invoices over 40 hours" never answers "invoices over 20 hours"
+LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"|\b\d[\d\-/:.]*\b")
+# Filler words ignored by the similarity tier
+STOPWORDS = frozenset(
+    "a an the all any of for to in on at by with and or is are was were be that which "
+    "who whose this these those please me my i can you show get give list find retrieve "
+    "what".split()
+)
+
+
+def normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join(question.lower().split()).strip(" ?.!")
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM outputs.
+
+    Tier 1 is an exact match on the normalized question (plus a context such as
+    the query result the answer was generated from). Tier 2 compares TF-IDF
+    vectors of hashed word unigrams and bigrams and returns the most similar
+    cached question with the same context when its cosine similarity reaches
+    similarity_threshold and its literals match.
+
+    Entries expire after ttl_seconds and the least recently used are evicted
+    beyond max_entries. The term-frequency rows of the similarity tier are
+    appended as questions are cached and evicted rows are cleared in place, so
+    a write never refits the whole matrix; the matrix is compacted once more
+    than half of its rows are dead.
+
+    put() returns True once save_every writes are unsaved; the caller then runs
+    save(), e.g. with asyncio.to_thread() so file I/O stays off the event loop.
+    """
+
+    def __init__(self, path=None, max_entries=1000, ttl_seconds=86400,
+                 similarity_threshold=0.9, dimensions=2048, save_every=20):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.dimensions = dimensions
+        self.save_every = save_every
+        self._entries = OrderedDict()  # key -> entry dict
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._rows = np.zeros((0, dimensions), dtype=np.float32)  # term frequencies, one row per key
+        self._row_keys = []  # key of each row, None for evicted rows
+        self._row_of = {}  # key -> row index
+        self._unsaved = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    # -- lookups -----------------------------------------------------------
+
+    def get(self, question, context=""):
+        """Cached value for the question, or None."""
+        normalized = normalize_question(question)
+        context_id = self._context_id(context)
+        now = time.time()
+        with self._lock:
+            key = self._key(normalized, context_id)
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] > now:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["value"]
+
+            key = self._most_similar(normalized, context_id, now)
+            if key is not None:
+                self._entries.move_to_end(key)
+                self.similar_hits += 1
+                return self._entries[key]["value"]
+
+            self.misses += 1
+            return None
+
+    def put(self, question, value, context=""):
+        """Cache a value for the question (and context).
+        Returns True when enough writes are unsaved that save() should run."""
+        normalized = normalize_question(question)
+        context_id = self._context_id(context)
+        with self._lock:
+            key = self._key(normalized, context_id)
+            self._entries[key] = {
+                "question": normalized,
+                "context": context_id,
+                "value": value,
+                "expires_at": time.time() + self.ttl_seconds,
+            }
+            self._entries.move_to_end(key)
+            self._add_row(key, normalized)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_row(evicted)
+            self._unsaved += 1
+            return bool(self.path) and self._unsaved >= self.save_every
+
+    def stats(self):
+        """Hit counts and hit rates per tier."""
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+                "exact_hit_rate": round(self.exact_hits / lookups, 3) if lookups else 0.0,
+                "similar_hit_rate": round(self.similar_hits / lookups, 3) if lookups else 0.0,
+            }
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self):
+        """Write unexpired entries to path, atomically."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if entry["expires_at"] > now]
+            self._unsaved = 0
+        with self._save_lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.path)
+
+    def load(self):
+        """Read entries saved by save(), skipping expired ones."""
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            for entry in entries[-self.max_entries:]:
+                if entry.get("expires_at", 0) > now:
+                    key = self._key(entry["question"], entry["context"])
+                    self._entries[key] = entry
+                    self._add_row(key, entry["question"])
+
+    # -- similarity tier ---------------------------------------------------
+
+    @staticmethod
+    def _context_id(context):
+        return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16] if context else ""
+
+    @staticmethod
+    def _key(normalized, context_id):
+        return f"{context_id}|{normalized}"
+
+    def _term_frequencies(self, normalized):
+        tokens = [token for token in TOKEN_PATTERN.findall(normalized) if token not in STOPWORDS]
+        terms = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        row = np.zeros(self.dimensions, dtype=np.float32)
+        for term in terms:
+            digest = hashlib.md5(term.encode("utf-8")).digest()
+            row[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+        return row
+
+    def _add_row(self, key, normalized):
+        """Append the question's term frequencies unless the key already has a row."""
+        if key in self._row_of:
+            return
+        count = len(self._row_keys)
+        if count == len(self._rows):
+            # Grow geometrically so appends are amortized O(1)
+            grown = np.zeros((max(16, 2 * count), self.dimensions), dtype=np.float32)
+            grown[:count] = self._rows[:count]
+            self._rows = grown
+        self._rows[count] = self._term_frequencies(normalized)
+        self._row_keys.append(key)
+        self._row_of[key] = count
+
+    def _drop_row(self, key):
+        """Clear an evicted key's row; compact once most rows are dead."""
+        index = self._row_of.pop(key, None)
+        if index is None:
+            return
+        self._rows[index] = 0.0
+        self._row_keys[index] = None
+        if len(self._row_keys) > 2 * len(self._row_of) + 16:
+            live = [position for position, row_key in enumerate(self._row_keys) if row_key is not None]
+            rows = np.zeros((max(16, 2 * len(live)), self.dimensions), dtype=np.float32)
+            rows[:len(live)] = self._rows[live]
+            self._rows = rows
+            self._row_keys = [self._row_keys[position] for position in live]
+            self._row_of = {row_key: position for position, row_key in enumerate(self._row_keys)}
+
+    def _most_similar(self, normalized, context_id, now):
+        keys = self._row_keys
+        if not self._row_of:
+            return None
+        query = self._term_frequencies(normalized)
+        if not query.any():
+            return None
+        rows = self._rows[:len(keys)]
+
+        # Smoothed IDF over the cached questions (cleared rows count as no terms), sublinear TF
+        document_frequency = np.count_nonzero(rows, axis=0)
+        idf = np.log((1.0 + len(self._row_of)) / (1.0 + document_frequency)) + 1.0
+        weighted = np.log1p(rows) * idf
+        query_weighted = np.log1p(query) * idf
+        norms = np.linalg.norm(weighted, axis=1) * np.linalg.norm(query_weighted)
+        scores = np.divide(weighted @ query_weighted, norms, out=np.zeros(len(keys), dtype=np.float32), where=norms > 0)
+
+        literals = sorted(LITERAL_PATTERN.findall(normalized))
+        for index in np.argsort(scores)[::-1]:
+            if scores[index] < self.similarity_threshold:
+                break
+            if keys[index] is None:
+                continue
+            entry = self._entries[keys[index]]
+            if (entry["context"] == context_id and entry["expires_at"] > now
+                    and sorted(LITERAL_PATTERN.findall(entry["question"])) == literals):
+                return keys[index]
+        return None
@@ -0,0 +1,37 @@
+import unittest
+from models.few_shot import FewShotIndex, format_examples
+
+class TestFewShotIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FewShotIndex([
+            {"question": "Find all users older than 30.", "query": "db.users.find({ age: { $gt: 30 } })"},
+            {"question": "Count the number of users.", "query": "db.users.countDocuments()"},
+            {"question": "Get all pending invoices", "query": "db.invoices.find({ status: 'pending' })"},
+            {"question": "", "query": "ignored"},
+        ])
+
+    def test_most_similar_first(self):
+        examples = self.index.top_k("How many invoices are pending?", k=2)
+        self.assertEqual(examples[0][1], "db.invoices.find({ status: 'pending' })")
+        self.assertEqual(len(examples), 1)
+
+    def test_collection_filter(self):
+        examples = self.index.top_k("Count the pending invoices", k=3, collection="invoices")
+        self.assertEqual([query for _, query in examples], ["db.invoices.find({ status: 'pending' })"])
+        self.assertEqual(self.index.top_k("pending invoices", collection="schedule"), [])
+
+    def test_seed_examples_use_known_collections(self):
+        index = FewShotIndex.from_file("configs/few_shot_examples.json")
+        self.assertTrue(index.pairs)
+        self.assertEqual(set(index.collections), {"users", "invoices", "schedule"})
+
+    def test_unknown_terms_return_nothing(self):
+        self.assertEqual(self.index.top_k("weather tomorrow"), [])
+        self.assertEqual(FewShotIndex([]).top_k("users"), [])
+
+    def test_format_examples(self):
+        self.assertEqual(format_examples([("q1", "a1")]), "Q: q1\nA: a1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from models.llm_cache import ResponseCache, normalize_question
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.cache.put("Find all active users", "db.users.find({status: 'active'})")
+        self.cache.put("Retrieve invoices where status is 'approved'", "db.invoices.find({status: 'approved'})")
+        self.cache.put("total hours for alice", "alice-query")
+
+    def test_normalize_question(self):
+        self.assertEqual(normalize_question("  Find ALL   users? "), "find all users")
+
+    def test_exact_hit(self):
+        self.assertEqual(self.cache.get("find all active users?"), "db.users.find({status: 'active'})")
+        self.assertEqual(self.cache.stats()["exact_hits"], 1)
+
+    def test_similar_hit(self):
+        self.assertEqual(self.cache.get("Show all the active users please"), "db.users.find({status: 'active'})")
+        self.assertEqual(self.cache.stats()["similar_hits"], 1)
+
+    def test_different_names_and_literals_miss(self):
+        self.assertIsNone(self.cache.get("total hours for bob"))
+        self.assertIsNone(self.cache.get("Retrieve invoices where status is 'rejected'"))
+
+    def test_context_must_match(self):
+        self.assertIsNone(self.cache.get("Find all active users", "answer:[]"))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, ttl_seconds=60)
+        cache.put("first question", 1)
+        cache.put("second question", 2)
+        cache.get("first question")
+        cache.put("third question", 3)
+        self.assertIsNone(cache.get("second question"))
+        self.assertEqual(cache.get("first question"), 1)
+
+        expired = ResponseCache(ttl_seconds=-1)
+        expired.put("first question", 1)
+        self.assertIsNone(expired.get("first question"))
+
+    def test_evicted_rows_are_not_matched(self):
+        cache = ResponseCache(max_entries=20)
+        for number in range(60):
+            cache.put(f"question about topic{number} details", number)
+        self.assertIsNone(cache.get("question about topic0 details"))
+        self.assertEqual(cache.get("question about topic59 details please"), 59)
+        self.assertLessEqual(len(cache._row_keys), 2 * 20 + 16)
+
+    def test_put_reports_when_save_is_due(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(os.path.join(directory, "llm_cache.json"), save_every=2)
+            self.assertFalse(cache.put("first question", 1))
+            self.assertTrue(cache.put("second question", 2))
+            cache.save()
+            self.assertFalse(cache.put("third question", 3))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache", "llm_cache.json")
+            cache = ResponseCache(path)
+            cache.put("Find all active users", "query")
+            cache.save()
+            self.assertEqual(ResponseCache(path).get("find all active users"), "query")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from app.templateEngine import default_engine
+
+class TestTemplateEngine(unittest.TestCase):
+
+    def test_total_hours_for_several_names(self):
+        match = default_engine.match("Total hours for Alice Smith and Bob?")
+        self.assertEqual((match.name, match.collection), ("total_hours", "users"))
+        self.assertEqual(match.pipeline[0]["$match"]["$expr"]["$in"][1], ["alice smith", "bob"])
+        self.assertEqual(match.pipeline[1]["$lookup"]["foreignField"], "faculty_id")
+        rows = [{"first_name": "Alice", "last_name": "Smith", "totalHours": 7.5, "invoiceCount": 2}]
+        self.assertEqual(match.render(rows), "Total hours for Alice Smith: 7.5 (2 invoices)")
+
+    def test_courses_from_schedule(self):
+        match = default_engine.match("courses taught by femi johnson")
+        self.assertEqual(match.collection, "schedule")
+        self.assertEqual(match.pipeline[0], {"$match": {"$expr": {"$in": [{"$toLower": "$instructor"}, ["femi johnson"]]}}})
+        rows = [{"instructor": "Femi Johnson", "course_code": "GBMG1001"}, {"instructor": "Femi Johnson", "course_code": "SUST1002"}]
+        self.assertEqual(match.render(rows), "Femi Johnson: GBMG1001, SUST1002")
+
+    def test_unknown_names_go_to_the_llm(self):
+        self.assertIsNone(default_engine.match("total hours for nobody").render([]))
+        self.assertIsNone(default_engine.match("courses for nobody").render([]))
+
+    def test_status_count(self):
+        match = default_engine.match("How many pending invoices are there?")
+        self.assertEqual((match.collection, match.pipeline[0]), ("invoices", {"$match": {"status": "pending"}}))
+        self.assertEqual(match.render([]), "There are 0 pending invoices.")
+
+    def test_unmatched_questions_go_to_the_llm(self):
+        self.assertIsNone(default_engine.match("Find all active users"))
+        self.assertIsNone(default_engine.match("total hours for invoices where status is pending"))
+        self.assertIsNone(default_engine.match("courses for femi johnson on monday"))
+
+if __name__ == '__main__':
+    unittest.main()
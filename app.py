@@ -1,15 +1,19 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, make_response
-import bcrypt
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, stream_with_context
 from config import Config
-from pymongo import MongoClient
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import csv
-from io import StringIO
+from pymongo import MongoClient, ReturnDocument
+from datetime import datetime
+import itertools
+import zlib
 from functools import wraps
 from chatbot_final import *
 from pathlib import Path
+from schedule import ScheduleCache, ScheduleProvider
+from reconciliation import ReconciliationStore, entries_frame, iter_report_csv, load_timesheet_entries
+from timesheet_store import as_legacy_timesheets, entry_document, find_entries, find_existing_entries, init_timesheet_storage, save_entries
+from passwords import PasswordHasher, PasswordServiceBusy
+from user_store import init_user_storage, find_faculty_member, find_user, user_exists, ROLE_PROJECTION, ROSTER_PROJECTION, TIMESHEET_PROJECTION
+import threading
+import time
 
 
 # Initialize Flask app
@@ -17,21 +21,42 @@ app = Flask(__name__)
 app.config.from_object(Config)
 
 base_dir = Path(__file__).resolve().parent  # Directory of the current script
-file_path = base_dir / "static" / "Sample_Fall 2024.xlsx"  # Construct the file path
+schedule_dir = Path(Config.SCHEDULE_DIR) if Config.SCHEDULE_DIR else base_dir / "static"
 
-# Check if the file exists
-if not file_path.exists():
-    raise FileNotFoundError(f"Excel file not found at: {file_path}")
+schedule_cache_dir = Path(Config.SCHEDULE_CACHE_DIR) if Config.SCHEDULE_CACHE_DIR else base_dir / ".schedule_cache"
 
-# Load the Excel file and clean up column names
-excel_data = pd.read_excel(file_path, sheet_name='Activities - Groups') 
-excel_data.columns = excel_data.columns.str.strip() 
+# Term schedules are loaded on first use, from a binary sidecar when one exists,
+# and reloaded when a workbook changes
+schedules = ScheduleProvider(schedule_dir, Config.SCHEDULE_TERM, cache=ScheduleCache(schedule_cache_dir))
+
+# Fail fast if the default term's workbook is missing
+schedules.path_for()
 
 # Initializing the client DB
 client = MongoClient(Config.MONGO_URI, tlsAllowInvalidCertificates=True)
 db = client['loginDB']
 users = db['users']
 
+# bcrypt runs on a bounded pool instead of the request threads
+passwords = PasswordHasher(Config.BCRYPT_ROUNDS, Config.BCRYPT_WORKERS, Config.BCRYPT_MAX_PENDING)
+
+# Precomputed per-entry reconciliation rows behind /finance and the report download
+reconciliation_store = ReconciliationStore(db)
+
+# Indexes, the nested -> timesheet_entries migration and the username_lower backfill run once per process
+storage_ready = threading.Event()
+storage_lock = threading.Lock()
+
+@app.before_request
+def prepare_timesheet_storage():
+    if storage_ready.is_set():
+        return
+    with storage_lock:
+        if not storage_ready.is_set():
+            init_timesheet_storage(db)
+            init_user_storage(db)
+            storage_ready.set()
+
 @app.route('/')
 def home():
     return redirect(url_for('login'))
@@ -48,15 +73,17 @@ def register():
             return jsonify({"error": "Username and password are required!"}), 400
 
         # Checking if user already exists
-        existing_user = users.find_one({'username': username})
-        if existing_user:
+        if user_exists(db, username):
             return jsonify({"error": "User already exists!"}), 400
 
         # Bicrypting the password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        try:
+            hashed_password = passwords.hash(password)
+        except PasswordServiceBusy:
+            return jsonify({"error": "Server is busy, please try again."}), 503
 
         # Inserting the user into MongoDB
-        db.users.insert_one({'username': username, 'password': hashed_password})
+        db.users.insert_one({'username': username, 'username_lower': username.lower(), 'password': hashed_password})
         return jsonify({"message": "Registration successful!"}), 201
 
     # Rendering registration page
@@ -78,9 +105,15 @@ def login():
             return render_template('login.html', error="Please select a role!")
 
         # Finding the user in MongoDB by username
-        user = users.find_one({'username': username})
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password']):
+        user = find_user(db, username)
+        try:
+            verified = bool(user) and passwords.verify(password, user['password'])
+        except PasswordServiceBusy:
+            return render_template('login.html', error="Server is busy, please try again.")
+        if verified:
             session['username'] = username  # Set session for logged-in user
+            rehash_password(username, password, user['password'])
+            remember_role(user)
 
             # Retrieving and checking role
             if user.get('role') == role:
@@ -100,6 +133,64 @@ def login():
     return render_template('login.html')
 
 
+def rehash_password(username, password, hashed):
+    """
+    Re-hash a verified password whose stored hash uses a different bcrypt cost.
+    """
+    if not passwords.needs_rehash(hashed):
+        return
+    try:
+        users.update_one({'username': username}, {'$set': {'password': passwords.hash(password)}})
+    except PasswordServiceBusy:
+        print(f"Skipped rehashing the password of {username}: password service busy")
+
+# Latest role version seen by this process per username, so a role change made
+# here invalidates cached session roles immediately
+role_versions = {}
+
+def remember_role(user):
+    """
+    Cache the user's role, its version and when it was read in the signed session.
+    """
+    session['role'] = user.get('role')
+    session['role_version'] = user.get('role_version', 0)
+    session['role_checked_at'] = time.time()
+
+def set_user_role(username, role):
+    """
+    Change a user's role and bump its version so cached session roles are invalidated.
+    """
+    user = users.find_one_and_update(
+        {'username': username},
+        {'$set': {'role': role}, '$inc': {'role_version': 1}},
+        projection={'role_version': 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if user:
+        role_versions[username] = user['role_version']
+        get_roster(db).invalidate()
+    return user is not None
+
+def session_role():
+    """
+    The logged-in user's role from the session. Mongo is only read when the session
+    has no role yet, its version is known to be stale, or it is older than
+    ROLE_RECHECK_SECONDS (which catches role changes made by other processes).
+    """
+    username = session['username']
+    cached = 'role' in session and session.get('role_version') == role_versions.get(username, session.get('role_version'))
+    fresh = time.time() - session.get('role_checked_at', 0) < Config.ROLE_RECHECK_SECONDS
+    if cached and fresh:
+        return session['role']
+
+    user = find_user(db, username, ROLE_PROJECTION)
+    if not user:
+        session.pop('role', None)
+        return None
+    role_versions[username] = user.get('role_version', 0)
+    remember_role(user)
+    return session['role']
+
 # A decorator for role-based access control
 def role_required(required_role):
 
@@ -113,9 +204,7 @@ def role_required(required_role):
 
             if 'username' in session:
 
-                user = users.find_one({'username': session['username']})
-
-                if user and user.get('role') == required_role:
+                if session_role() == required_role:
 
                     return func(*args, **kwargs)
 
@@ -131,6 +220,15 @@ def role_required(required_role):
 
     return decorator
 
+# Password hashing pool metrics
+@app.route('/password_metrics', methods=['GET'])
+@role_required('Finance')
+def password_metrics():
+    """
+    Queue depth, rejections and timings of the password hashing pool.
+    """
+    return jsonify(passwords.metrics())
+
 # Finance Route
 @app.route('/finance', methods=['GET', 'POST'])
 @role_required('Finance')
@@ -139,7 +237,10 @@ def finance():
         # Get filter parameters from query string
         from_date = request.args.get('from_date')
         to_date = request.args.get('to_date')  
-        transactions, messages = finance_faculty_check(from_date, to_date)
+        term = request.args.get('term')
+        if not is_known_term(term):
+            return render_template('error.html', error=f"No schedule found for term '{term}'."), 404
+        transactions, messages = finance_faculty_check(from_date, to_date, term)
         return render_template('finance.html', transactions=transactions, messages=messages)  # Render the timesheet if the user is logged in
     else:
         return redirect(url_for('login'))  # Redirect to login if not authenticated
@@ -153,259 +254,130 @@ def download_finance_report():
         from_date = request.args.get('from_date')  # e.g., "2024-01-01"
         to_date = request.args.get('to_date')  # e.g., "2024-01-31"
         
-        # Fetch filtered data
-        transactions, _ = finance_faculty_check(from_date, to_date)
-        if not transactions:
+        term = request.args.get('term')
+        if not is_known_term(term):
+            return jsonify({"error": f"No schedule found for term '{term}'."}), 404
+        compress = request.args.get('gzip') in ('1', 'true', 'yes')
+
+        # Stream per-entry rows straight from the precomputed reconciliation cursor
+        rows = iter(finance_report_rows(from_date, to_date, term))
+        first_row = next(rows, None)
+        if first_row is None:
             return jsonify({"error": "No transactions found for the given date range."}), 404
-        
-        # Generate CSV content
-        si = StringIO()
-        csv_writer = csv.DictWriter(si, fieldnames=["Faculty Name", "Hours Worked", "Status"])
-        csv_writer.writeheader()
-        # Modify discrepancies symbols (if needed) before writing rows
-        for transaction in transactions:
-            if transaction["Status"] == "✓":
-                transaction["Status"] = "Hours Matched"  
-            else:
-                transaction["Status"] = "Hours Unmatched"
-            csv_writer.writerow(transaction)
-        # Create a response to send the CSV file
-        response = make_response(si.getvalue().encode('utf-8'))
-        response.headers["Content-Disposition"] = "attachment; filename=report_profiles.csv"
-        response.headers["Content-Type"] = "text/csv;charset=utf-8"
+
+        chunks = iter_report_csv(itertools.chain([first_row], rows))
+        filename = "report_profiles.csv"
+        content_type = "text/csv;charset=utf-8"
+        if compress:
+            chunks = gzip_chunks(chunks)
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        response = Response(stream_with_context(chunks), content_type=content_type)
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
         return response
     else:
         return redirect(url_for('login'))  # Redirect to login if not authenticated
 
+def gzip_chunks(chunks):
+    """
+    Gzip-compress a stream of text chunks on the fly.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
 # Processing Faculty Details in Finance Page
-def finance_faculty_check(from_date=None, to_date=None):
+def finance_faculty_check(from_date=None, to_date=None, term=None):
     # Parse dates if provided
     from_date = datetime.strptime(from_date, "%Y-%m-%d") if from_date else None
     to_date = datetime.strptime(to_date, "%Y-%m-%d") if to_date else None
-    # Fetching all user data
-    transactions = []
-    messages = []
-    faculty_hours = {}
-    faculty_records = users.find({'role': 'Faculty'})
-
-    for faculty in faculty_records:
-        faculty_name =faculty['username']
-        timesheets = faculty.get('timesheets', [])
-        status = faculty.get('status', '✗')
-        if not timesheets:
-            continue
-
-        for timesheet in timesheets:
-            for week in ['week1', 'week2']:
-                for entry in timesheet.get(week, []):
-                    # Calculate discrepancies
-                    hours_worked = int(entry['hoursWorked'])
-                    course_code = entry['courseCode']
-                    entry_date = datetime.strptime(entry['date'], "%Y-%m-%d")
-
-                    # Filter by date range
-                    if from_date and entry_date < from_date:
-                        continue
-                    if to_date and entry_date > to_date:
-                        continue   
-
-                    # Match instructor's record in the Excel schedule
-                    faculty_match = excel_data[excel_data['Instructor'] == faculty_name]
-                    date_match = faculty_match[faculty_match['Start Date'] == entry_date.strftime("%m/%d/%Y")] # Convert datetime object to string in 'MM/DD/YYYY' format
-                    course_match = date_match[date_match['Subject'].str.contains(course_code, na=False)]
-
-                    if len(course_match) > 1:
-                        total_hours = sum(time_cal(match) for _, match in course_match.iterrows())
-                    elif len(course_match) == 1:
-                        total_hours = time_cal(course_match.iloc[0])
-                    else:
-                        total_hours = 0
-                        messages.append(f"No schedule entry found for {faculty_name} on {entry['date']} for course {course_code}")
-
-
-                    if faculty_name not in faculty_hours:
-                        faculty_hours[faculty_name] = hours_worked
-                    else:
-                        faculty_hours[faculty_name] += hours_worked
-                    # faculty_hours[faculty_name] = faculty_hours.get(faculty_name, 0) + hours_worked
-                    timetable = extract_timetable(excel_data, faculty_name, course_code)
-                    # Check for discrepancies
-                    if status == '✓':
-                        continue
-                    if isinstance(timetable, pd.DataFrame):
-                        for _, row in timetable.iterrows():
-                            # Calculate the hours worked for this specific schedule entry
-                            start_time = row['Start Time']
-                            end_time = row['End Time']
-                            hours_worked = calculate_hours_for_schedule(start_time, end_time)
-                            
-                            # Check for discrepancies with the database
-                            status = check_discrepancies_with_database(status, faculty_name, course_code, row, hours_worked)
-                    else:
-                        status = '✓' if faculty_hours[faculty_name] == total_hours else '✗'
-                        
-        if faculty_hours.get(faculty_name, 0) > 0:
-            transactions.append({
-                "Faculty Name": faculty_name,
-                #"Hours Worked": faculty_hours[faculty_name],
-                "Hours Worked": faculty_hours.get(faculty_name, 0),
-                "Status": status
-            })
-    return transactions, messages
+    # Reading the precomputed rows
+    term = current_reconciliation_term(term)
+    return reconciliation_store.summary(term, from_date, to_date)
 
-def extract_timetable(excel_data, instructor_name, course_code):
+def finance_report_rows(from_date=None, to_date=None, term=None):
     """
-    Extracts the timetable for the given instructor and course code.
-    Ensures strict matching for the instructor and partial matching for the course code.
+    Cursor over the per-entry reconciliation rows for the finance report.
     """
-    # Clean the data by stripping spaces and converting to lowercase for consistency
-    excel_data['Instructor'] = excel_data['Instructor'].str.strip().str.lower()
-    excel_data['Subject'] = excel_data['Subject'].str.strip().str.lower()
-
-    # Clean the inputs
-    instructor_name = instructor_name.strip().lower()
-    course_code = course_code.strip().lower()
-
-    # Filter data: strict match for instructor, partial match for course code
-    filtered_data = excel_data[
-        (excel_data['Instructor'] == instructor_name) &  # Exact match for instructor
-        (excel_data['Subject'].str.startswith(course_code))  # Partial match at the start of the subject
-    ]
-    
-    if filtered_data.empty:
-        return f"No timetable found for Instructor: {instructor_name}, Course: {course_code}"
-    
-    # Convert 'Start Date' and 'End Date' columns to datetime objects
-    filtered_data = filtered_data.copy()
-    filtered_data.loc[:, 'Start Date'] = pd.to_datetime(filtered_data['Start Date'], format='%m/%d/%Y')
-    filtered_data.loc[:, 'End Date'] = pd.to_datetime(filtered_data['End Date'], format='%m/%d/%Y')
-
-
-
-    #filtered_data['Start Date'] = pd.to_datetime(filtered_data['Start Date'], format='%m/%d/%Y')
-    filtered_data['End Date'] = pd.to_datetime(filtered_data['End Date'], format='%m/%d/%Y')
-    
-    # Extract relevant timetable details
-    timetable_details = filtered_data[['Start Date', 'End Date', 'Start Time', 'End Time', 'Days of the Week']]
-    return timetable_details
-
-def get_dates_for_weekday(start_date, end_date, weekdays):
+    from_date = datetime.strptime(from_date, "%Y-%m-%d") if from_date else None
+    to_date = datetime.strptime(to_date, "%Y-%m-%d") if to_date else None
+    term = current_reconciliation_term(term)
+    return reconciliation_store.find_rows(term, from_date, to_date)
+
+def is_known_term(term):
     """
-    Returns all dates within the given range that fall on the specified weekdays.
+    True when term is empty (the default term) or has a schedule workbook.
     """
-    day_mapping = {
-        "M": 0,  # Monday
-        "T": 1,  # Tuesday
-        "W": 2,  # Wednesday
-        "Th": 3,  # Thursday
-        "F": 4,  # Friday
-        "Sa": 5,  # Saturday
-        "Su": 6   # Sunday
-    }
-
-    start_date = datetime.strptime(start_date, "%m/%d/%Y")
-    end_date = datetime.strptime(end_date, "%m/%d/%Y")
-    target_days = [day_mapping.get(day.upper()) for day in weekdays]
-
-    if None in target_days:
-        raise ValueError("Invalid weekday abbreviation.")
-
-    dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() in target_days:
-            dates.append(current_date.strftime("%m/%d/%Y"))
-        current_date += timedelta(days=1)
-
-    return dates
-
-def calculate_hours_for_schedule(start_time, end_time):
+    if not term:
+        return True
+    try:
+        schedules.path_for(term)
+    except FileNotFoundError:
+        return False
+    return True
+
+def current_reconciliation_term(term=None):
     """
-    Calculate the hours worked for a specific schedule entry.
+    Resolve the term and rebuild its reconciliation rows first if its schedule changed.
     """
-    if isinstance(start_time, datetime):
-        start_time = start_time.time()
-    if isinstance(end_time, datetime):
-        end_time = end_time.time()
-
-    today = datetime.today().date()
-    
-    start_datetime = datetime.combine(today, start_time)
-    end_datetime = datetime.combine(today, end_time)
-    
-    time_diff = end_datetime - start_datetime
-    total_hours_per_class = time_diff.total_seconds() / 3600  # Convert seconds to hours
-    
-    return total_hours_per_class
-
-
-def check_discrepancies_with_database(status, instructor_name, course_code, timetable, hours_worked):
+    term = term or schedules.default_term
+    snapshot = schedules.snapshot(term)
+    if not reconciliation_store.is_current(term, snapshot.version):
+        term_start, term_end = term_date_range(term, snapshot)
+        reconciliation_store.rebuild(term, snapshot, load_timesheet_entries(db, term_start, term_end))
+    return term
+
+def term_date_range(term, snapshot):
     """
-    Check if the extracted timetable matches the database records for day, date, and hours worked.
+    (start, end) datetimes of the entries a term's rows cover, or None for an open end.
+    Other terms only take entries within their class dates, which are the only ones
+    that can match them; the default term takes every entry so claims outside all
+    class dates still reach finance as unscheduled.
     """
-    # Query MongoDB for instructor and course code
-    db_data = users.find({"username": instructor_name, "timesheets.week1.courseCode": course_code})
-
-    # Loop through each record in the database
-    for record in db_data:
-        print(f"Checking record for instructor {instructor_name}, course code {course_code}...")
-
-        for timesheet in record['timesheets']:
-            for week_entry in timesheet.get('week1', []):
-                # Compare course codes
-                if week_entry['courseCode'] == course_code:
-                    db_days = week_entry['day']  # Days stored in MongoDB (e.g., "Tuesday")
-
-                    # Check for day discrepancy
-                    timetable_days = timetable['Days of the Week']
-                    day_mapping = {"M":"Monday","T": "Tuesday", "W": "Wednesday", "Th": "Thursday", "F": "Friday","Sa":"Saturday"}
-                    timetable_day = day_mapping.get(timetable_days, timetable_days)  # Apply this on Excel data
-                    
-
-                    # Check for date discrepancy
-                    timetable_start_date = timetable['Start Date'].strftime('%m/%d/%Y')  # Directly use the Timestamp object
-                    timetable_end_date = timetable['End Date'].strftime('%m/%d/%Y')  # Directly use the Timestamp object
-
-                    calculated_dates = get_dates_for_weekday(timetable_start_date,
-                                                             timetable_end_date,
-                                                             timetable_days)
-
-                    calculated_dates = [datetime.strptime(date_str, "%m/%d/%Y").date() for date_str in calculated_dates]
-        
+    if term == schedules.default_term:
+        return None, None
+    return snapshot.date_range
 
-                    # Get the corresponding database date and days
-                    db_date_str = week_entry['date']  # Database date as a string
-                    db_date = datetime.strptime(db_date_str, "%Y-%m-%d").date() # Convert to datetime
-
-                    # Calculate hours from Excel timetable and compare with database
-                    db_hours_worked = float(week_entry['hoursWorked'])
-
-                    if (db_days != timetable_day) :
-                        status = '✗'
-                    elif not db_date in calculated_dates:
-                        status = '✗'
-                    elif hours_worked != db_hours_worked:
-                        status = '✗'
-                    else:
-                        status = '✓'
-    
-    return status
- 
-
-
-# Finance comparision code
-def time_cal(course_match):
-    time_format = "%H:%M:%S"
-    start_time = datetime.strptime(str(course_match.get('Start Time')), time_format)
-    end_time = datetime.strptime(str(course_match['End Time']), time_format)
-    
-    # Calculate the difference (which will be a timedelta object)
-    time_diff = end_time - start_time
-    
-    # Get the total hours spent
-    total_hours = time_diff.total_seconds() / 3600  # Convert seconds to hours
-    total_hours = np.ceil(total_hours).astype(int)
-    return total_hours
+def refresh_reconciliation(faculty_name, new_entries):
+    """
+    Update the materialized reconciliation rows of one faculty member for the
+    timesheet_entries documents they just saved, in every term built so far,
+    keeping only the entries within each term's date range.
+    Terms whose schedule changed since are left to rebuild on their next read,
+    and terms whose workbook was removed are dropped.
+    """
+    if not new_entries:
+        return
+    faculty = find_user(db, faculty_name, ROSTER_PROJECTION) or {}
+    status = faculty.get('status', '✗')
+    available_terms = set(schedules.terms())
+    for term in reconciliation_store.current_terms():
+        if term not in available_terms:
+            reconciliation_store.drop_term(term)
+            continue
+        snapshot = schedules.snapshot(term)
+        while reconciliation_store.is_current(term, snapshot.version):
+            # Same window a rebuild loads, so a refresh never adds rows a rebuild would drop
+            term_start, term_end = (day.strftime("%Y-%m-%d") if day else None for day in term_date_range(term, snapshot))
+            term_entries = [
+                entry for entry in new_entries
+                if (not term_start or entry['date'] >= term_start) and (not term_end or entry['date'] <= term_end)
+            ]
+            if not term_entries:
+                break
+            entries = entries_frame(
+                (faculty_name, status, entry['date'], entry['day'], entry['courseCode'], entry['hoursWorked'], entry['comments'])
+                for entry in term_entries
+            )
+            keys = [(entry['date'], entry['courseCode']) for entry in term_entries]
+            if reconciliation_store.refresh(term, snapshot, faculty_name, entries, keys):
+                break
+            # Rebuilt against a newer schedule meanwhile: refresh those rows instead
+            snapshot = schedules.snapshot(term)
 
 # Updating the Status based on the changes in the UI
 @app.route('/update_status', methods=['POST'])
@@ -424,31 +396,44 @@ def update_status():
     )
 
     if result.modified_count > 0:
+        reconciliation_store.set_status(faculty_name, status)
         return jsonify({"message": "Status updated successfully"}), 200
     else:
         return jsonify({"error": "No changes made"}), 400
 
+# Changing a user's role
+@app.route('/update_role', methods=['POST'])
+@role_required('Finance')
+def update_role():
+    data = request.json
+    username = data.get('username')
+    role = data.get('role')
+
+    if not username or role not in ['Faculty', 'Finance']:
+        return jsonify({"error": "Invalid data"}), 400
+
+    if set_user_role(username, role):
+        return jsonify({"message": "Role updated successfully"}), 200
+    else:
+        return jsonify({"error": "User not found"}), 404
+
 @app.route('/faculty_details/<faculty_name>', methods=['GET'])
 @role_required('Finance')
 def faculty_details(faculty_name):
     if 'username' in session:  # Ensure the user is authenticated
-        faculty = users.find_one({'role': 'Faculty', 'username': faculty_name})
-        if not faculty:
+        if not find_faculty_member(db, faculty_name):
             return f"Faculty '{faculty_name}' not found.", 404
 
         # Extract relevant details
         details = []
-        timesheets = faculty.get('timesheets', [])
-        for timesheet in timesheets:
-            for week in ['week1', 'week2']:
-                for entry in timesheet.get(week, []):
-                    details.append({
-                        "Date": entry.get('date'),
-                        "Day": entry.get('day'),
-                        "Course_Code": entry.get('courseCode'),
-                        "Hours_Worked": entry.get('hoursWorked'),
-                        "Comments": entry.get('comments', "N/A")
-                    })
+        for entry in find_entries(db, faculty_name, TIMESHEET_PROJECTION):
+            details.append({
+                "Date": entry.get('date'),
+                "Day": entry.get('day'),
+                "Course_Code": entry.get('courseCode'),
+                "Hours_Worked": entry.get('hoursWorked'),
+                "Comments": entry.get('comments', "N/A")
+            })
 
         return render_template('faculty_view.html', faculty_name=faculty_name, details=details)
     else:
@@ -472,61 +457,53 @@ def submit_timesheet():
     # Log received data
     print(f"Received: start_date={start_date}, end_date={end_date}, timesheet_data={timesheet_data}")
 
-    # Process each timesheet entry
-    for entry in timesheet_data:
-        date = entry['date']
-        day = entry['day']
-        course_code = entry['course_code']
-        hours_worked = entry['hours_worked']
-        comments = entry['comments']
+    # Validate every row before writing anything
+    new_entries = []
+    for entry in timesheet_data or []:
+        hours_worked = entry.get('hours_worked')
 
         # Validate hours worked
-        if not hours_worked or not hours_worked.strip().replace('.', '', 1).isdigit():
+        if not hours_worked or not str(hours_worked).strip().replace('.', '', 1).isdigit():
             return jsonify({'status': 'error', 'message': 'Please provide a valid number for hours worked!'}), 400
-        
-        hours_worked = float(hours_worked)
+        if not entry.get('date') or not entry.get('course_code'):
+            return jsonify({'status': 'error', 'message': 'Each entry needs a date and a course code!'}), 400
+
+        new_entries.append(entry_document(
+            session['username'],
+            entry['date'],
+            entry.get('day'),
+            entry['course_code'],
+            float(hours_worked),
+            entry.get('comments'),
+        ))
+
+    # Check all submitted (date, course) keys against existing entries in one query
+    if not confirm_override:
+        existing_entries = find_existing_entries(db, new_entries)
+        for new_entry in new_entries:
+            existing_entry = existing_entries.get((new_entry['date'], new_entry['courseCode']))
+            # If entry exists, check if hours worked differ
+            if existing_entry and float(existing_entry['hoursWorked']) != new_entry['hoursWorked']:
+                return jsonify({
+                    'status': 'warning',
+                    'message': f"Timesheet for {new_entry['courseCode']} on {new_entry['date']} already exists with {existing_entry['hoursWorked']} hours. Do you want to override?"
+                }), 409  # Conflict
 
-        # Check for existing entry
-        existing_entry = users.find_one({
-            'username': session['username'],
-            'timesheets.week1.date': date,
-            'timesheets.week1.day': day,
-            'timesheets.week1.courseCode': course_code
-        })
+    # Insert or update every entry with a single ordered bulk write
+    save_entries(db, new_entries)
 
-        if existing_entry:
-            # If entry exists, check if hours worked differ
-            for week in existing_entry['timesheets']:
-                for entry in week['week1']:
-                    if entry['date'] == date and entry['day'] == day and entry['courseCode'] == course_code:
-                        if float(entry['hoursWorked']) != hours_worked:
-                            if not confirm_override:
-                                return jsonify({
-                                    'status': 'warning',
-                                    'message': f"Timesheet for {course_code} on {date} already exists with {entry['hoursWorked']} hours. Do you want to override?"
-                                }), 409  # Conflict
-                            else:
-                                # Proceed with overriding the entry
-                                users.update_one(
-                                    {'username': session['username']},
-                                    {'$pull': {'timesheets': {'week1.date': date, 'week1.day': day, 'week1.courseCode': course_code}}}
-                                )
-
-        # Insert or update the timesheet entry in the database
-        new_entry = {
-            'week1': [{
-                'date': date,
-                'day': day,
-                'courseCode': course_code,
-                'hoursWorked': hours_worked,
-                'comments': comments
-            }]
-        }
-
-        users.update_one(
-            {'username': session['username']},
-            {'$addToSet': {'timesheets': new_entry}}, upsert=True
-        )
+    # Cached chatbot answers about this user are out of date now
+    result_cache.invalidate_usernames([session['username']])
+
+    # The entries are saved; a failed refresh only means the finance rows are rebuilt on their next read
+    try:
+        refresh_reconciliation(session['username'], new_entries)
+    except Exception as e:
+        print(f"Could not refresh reconciliation rows for {session['username']}: {e}")
+        try:
+            reconciliation_store.expire()
+        except Exception as e:
+            print(f"Could not expire reconciliation rows: {e}")
 
     return jsonify({'status': 'success', 'message': 'Timesheet submitted successfully'}),200 
 
@@ -560,21 +537,17 @@ def view_timesheet():
 
     try:
 
-        # Fetch the user document from the database
-
-        user_data = users.find_one({'username': username})
+        # Make sure the user exists (only the _id is fetched)
 
-
-
-        if not user_data:
+        if not user_exists(db, username):
 
             return jsonify({"error": "User not found"}), 404
 
 
 
-        # Retrieve the timesheets field from the user's document
+        # Retrieve the user's entries in the layout the faculty page expects
 
-        timesheets = user_data.get('timesheets', [])
+        timesheets = as_legacy_timesheets(find_entries(db, username, TIMESHEET_PROJECTION))
 
 
 
@@ -592,6 +565,13 @@ def chatbot():
     response = process_question(question)  # Replace with your chatbot logic
     return jsonify({"response": response})
 
+@app.route('/chatbot/health', methods=['GET'])
+def chatbot_health():
+    ok, error = check_health()
+    if ok:
+        return jsonify({"status": "ok"}), 200
+    return jsonify({"status": "error", "message": error}), 503
+
 def process_question(question):
     if question.lower() in ("hello","hi") :
         results = "Hi there! How can I help you?"
@@ -607,21 +587,24 @@ def process_question(question):
         if not question:
             return jsonify({"response": "Please provide a valid question."})
 
+        # Shared, pooled chatbot client; no connection setup per question
         db = connect_db()
         if db is None:
             return jsonify({"response": "Error connecting to the database."})
 
         print("Chatbot is analyzing your question...")
-        query = parse_user_question(question)
-        if query == "list_faculty":
+        intent, query = route_question(question)
+        if intent in ("list_faculty", "more_faculty", "faculty_prefix"):
             print("CHATBOT: Fetching faculty member names...")
-            faculty_list = list_all_faculty_members(db)
+            # The signed session remembers where a "more" question continues the listing
+            faculty_list = answer_faculty_question(db, intent, query, session)
             return faculty_list
             
-        if isinstance(query, str) and query.startswith("Error"):
-            return jsonify({"response": query})
+        # Errors and fixed replies (e.g. login help) are returned as they are
+        if isinstance(query, str):
+            return query
 
-        results = execute_query(db, query)
+        results = execute_query(db, query, extract_usernames(question))
         print("Results==================================================================")
         print(results)
         if results:
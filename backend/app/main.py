@@ -3,7 +3,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import auth
 from app.database import DatabaseConnection
-from app.migration import run_migration
+from app.migration import run_migration, ensure_indexes
 
 
 # Initialize FastAPI app
@@ -30,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Lets browsers read the /facultyCollection page cursor
 )
 
 # Initialize database connection
@@ -38,6 +39,7 @@ from app.database import DatabaseConnection
 @app.on_event("startup")
 async def startup_event():
     await DatabaseConnection.connect()
+    await ensure_indexes()
     
     # Check if migration has already run (for example, check if a specific collection or document exists)
     migration_done = await DatabaseConnection.db.migrations.find_one({"name": "initial_migration"})
@@ -1,5 +1,7 @@
 import asyncio
 from app.database import DatabaseConnection
+from app.models import EMAIL_COLLATION
+from app.roster import roster
 from datetime import datetime
 from bson import ObjectId
 from passlib.hash import bcrypt
@@ -51,4 +53,10 @@ async def run_migration():
         await db.users.insert_one(admin_user)
         print("Admin user created successfully.")
     else:
-        print("Admin user already exists.")
\ No newline at end of file
+        print("Admin user already exists.")
+
+async def ensure_indexes():
+    """ Create indexes used by the API; safe to run on every startup. """
+    db = DatabaseConnection.db
+    await db.users.create_index("email", name="email_ci", collation=EMAIL_COLLATION)
+    await roster.ensure_indexes(db)
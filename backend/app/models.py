@@ -5,6 +5,10 @@ from app.database import DatabaseConnection
 from datetime import datetime
 from enum import Enum
 
+# Case-insensitive comparison for emails; queries must pass the same collation as
+# the users.email index for it to be used
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+
 class UserRole(str, Enum):
     FACULTY = "faculty"
     FINANCE = "finance"
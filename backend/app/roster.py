@@ -0,0 +1,63 @@
+import re
+import time
+from collections import OrderedDict
+from bson import ObjectId
+from pymongo import ASCENDING
+
+# Fields of a users document that FacultyResponse needs
+ROSTER_PROJECTION = {
+    "email": 1, "first_name": 1, "last_name": 1, "role": 1, "status": 1,
+    "phone_number": 1, "is_logged_in": 1, "last_login": 1, "created_at": 1,
+}
+
+class FacultyRoster:
+    """ Faculty documents in _id order, one page at a time, via the (role, _id) index.
+    Pages are addressed by the last _id of the previous page instead of skip, and recent
+    pages are cached for ttl_seconds. """
+
+    def __init__(self, role="faculty", ttl_seconds=30, max_pages=64):
+        self.role = role
+        self.ttl_seconds = ttl_seconds
+        self.max_pages = max_pages
+        self._pages = OrderedDict()  # (after, prefix, limit) -> (expires_at, documents, next cursor)
+
+    async def ensure_indexes(self, db):
+        await db.users.create_index([("role", ASCENDING), ("_id", ASCENDING)], name="role_id")
+
+    async def page(self, db, after=None, prefix=None, limit=None):
+        """ Returns (documents, next cursor or None); limit=None returns every remaining document.
+        Raises bson.errors.InvalidId for a bad cursor. """
+        key = (after, prefix.lower() if prefix else None, limit)
+        cached = self._pages.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._pages.move_to_end(key)
+            return cached[1], cached[2]
+
+        query = {"role": self.role}
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        if prefix:
+            # Anchored match on either name, evaluated within the role's index range
+            pattern = {"$regex": f"^{re.escape(prefix)}", "$options": "i"}
+            query["$or"] = [{"first_name": pattern}, {"last_name": pattern}]
+
+        cursor = db.users.find(query, ROSTER_PROJECTION).sort("_id", ASCENDING)
+        if limit is None:
+            documents, next_cursor = await cursor.to_list(None), None
+        else:
+            documents = await cursor.limit(limit + 1).to_list(limit + 1)
+            next_cursor = str(documents[limit - 1]["_id"]) if len(documents) > limit else None
+            documents = documents[:limit]
+
+        self._pages[key] = (time.monotonic() + self.ttl_seconds, documents, next_cursor)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return documents, next_cursor
+
+    def invalidate(self):
+        """ Drop cached pages after a faculty member is added or changed. """
+        self._pages.clear()
+
+# Shared by every request of this process
+roster = FacultyRoster()
@@ -1,17 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.models import get_user_by_email
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from app.models import get_user_by_email, EMAIL_COLLATION
 from app.security import verify_password, create_access_token, create_refresh_token, get_password_hash
 from app.schemas import (
     LoginRequest, LoginResponse, RegisterFacultyRequest, RegisterFacultyResponse,
     FacultyResponse, UpdateFacultyRequest, UpdateFacultyByFinanceRequest
 )
-from typing import List
+from typing import List, Optional
 from datetime import timedelta, datetime
 from jose import jwt, JWTError
 from bson import ObjectId
+from bson.errors import InvalidId
 from app.config import settings
 from app.dependencies import get_current_user
 from app.database import get_database
+from app.roster import roster
 
 router = APIRouter()
 
@@ -44,6 +46,7 @@ async def login(request: LoginRequest, db=Depends(get_database)):
         },
         "$push": {"login_history": login_entry}}
     )
+    roster.invalidate()
 
     # Generate Tokens
     access_token = create_access_token(data={"sub": user["email"], "role": user["role"]}, expires_delta=timedelta(minutes=60))
@@ -80,8 +83,8 @@ async def register_faculty(request: RegisterFacultyRequest, current_user: dict =
     # ✅ Convert email to lowercase before checking & saving
     normalized_email = request.email.lower()
 
-    # ✅ Case-insensitive email check
-    existing_user = await db.users.find_one({"email": {"$regex": f"^{normalized_email}$", "$options": "i"}})
+    # ✅ Case-insensitive email check, served by the email_ci collation index
+    existing_user = await db.users.find_one({"email": normalized_email}, {"_id": 1}, collation=EMAIL_COLLATION)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already exists")
 
@@ -104,6 +107,7 @@ async def register_faculty(request: RegisterFacultyRequest, current_user: dict =
     }
 
     await db.users.insert_one(new_user)
+    roster.invalidate()
 
     return RegisterFacultyResponse(
         message="Faculty registration successful!",
@@ -150,6 +154,7 @@ async def update_faculty_self(request: UpdateFacultyRequest, current_user: dict
 
     update_data["updated_at"] = datetime.utcnow()
     await db.users.update_one({"_id": ObjectId(current_user["id"])}, {"$set": update_data})
+    roster.invalidate()
 
     return {"message": "Profile updated successfully", "updated_fields": list(update_data.keys())}
 
@@ -190,19 +195,36 @@ async def update_faculty_by_finance(
 
     update_data["updated_at"] = datetime.utcnow()
     await db.users.update_one({"_id": ObjectId(faculty_id)}, {"$set": update_data})
+    roster.invalidate()
 
     return {"message": "Faculty details updated successfully", "updated_fields": list(update_data.keys())}
 
 @router.get("/facultyCollection", response_model=List[FacultyResponse])
-async def get_faculty_collection(current_user: dict = Depends(get_current_user), db=Depends(get_database)):
-    """ Retrieve Complete faculty Collection. Only finance can access this. """
+async def get_faculty_collection(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    after: Optional[str] = None,
+    prefix: Optional[str] = Query(None, min_length=1, max_length=50),
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """ Retrieve the faculty collection. Only finance can access this.
+    Without `limit` every faculty member is returned, as before paging existed.
+    With `limit`, pass the X-Next-Cursor header of a response as `after` to get
+    the next page; `prefix` filters on first or last name. """
       
     if current_user["role"] != "finance":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only finance can view faculty details")
     
-    faculty_collection = await db.users.find({"role":"faculty"}).to_list(None)  # Convert cursor to list
+    try:
+        faculty_collection, next_cursor = await roster.page(db, after, prefix, limit)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    if not faculty_collection:
+    if not faculty_collection and not after:
         raise HTTPException(status_code=404, detail="No records found.")
 
     return [
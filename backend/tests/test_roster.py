@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from bson.errors import InvalidId
+from app.roster import FacultyRoster
+
+
+class AsyncCursor:
+    """ The slice of motor's cursor API that FacultyRoster uses, over a mongomock cursor. """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def limit(self, count):
+        self.cursor = self.cursor.limit(count)
+        return self
+
+    async def to_list(self, length):
+        return list(self.cursor)
+
+
+class AsyncUsers:
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, *args):
+        return AsyncCursor(self.collection.find(*args))
+
+
+class AsyncDatabase:
+
+    def __init__(self, db):
+        self.users = AsyncUsers(db.users)
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestFacultyCollectionPaging(unittest.TestCase):
+
+    def setUp(self):
+        self.users = mongomock.MongoClient()["fintrack"].users
+        self.users.insert_many([
+            {"email": f"faculty{number}@example.com", "first_name": f"Name{number}", "last_name": "Faculty", "role": "faculty"}
+            for number in range(5)
+        ])
+        self.users.insert_one({"email": "finance@example.com", "first_name": "Fin", "last_name": "Ance", "role": "finance"})
+        self.db = AsyncDatabase(self.users.database)
+        self.roster = FacultyRoster()
+
+    def page(self, *args, **kwargs):
+        return asyncio.run(self.roster.page(self.db, *args, **kwargs))
+
+    def test_no_limit_returns_every_faculty_member(self):
+        documents, next_cursor = self.page()
+        self.assertEqual(len(documents), 5)
+        self.assertIsNone(next_cursor)
+
+    def test_pages_follow_the_cursor(self):
+        emails = []
+        documents, after = self.page(limit=2)
+        emails += [document["email"] for document in documents]
+        while after:
+            documents, after = self.page(after, limit=2)
+            emails += [document["email"] for document in documents]
+        self.assertEqual(emails, [f"faculty{number}@example.com" for number in range(5)])
+
+    def test_prefix_matches_either_name(self):
+        documents, _ = self.page(prefix="name3")
+        self.assertEqual([document["email"] for document in documents], ["faculty3@example.com"])
+
+    def test_invalidate_drops_cached_pages(self):
+        self.assertEqual(len(self.page()[0]), 5)
+        self.users.insert_one({"email": "new@example.com", "first_name": "New", "last_name": "Faculty", "role": "faculty"})
+        self.assertEqual(len(self.page()[0]), 5)
+        self.roster.invalidate()
+        self.assertEqual(len(self.page()[0]), 6)
+
+    def test_bad_cursor_raises(self):
+        with self.assertRaises(InvalidId):
+            self.page("not-an-id", limit=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,125 +1,429 @@
 from pymongo import MongoClient
 from config import Config
+from roster import FacultyRoster
+from timesheet_store import ENTRIES_COLLECTION
+from collections import OrderedDict, deque
+import json
 import re
+import threading
+import time
+
+# One client (and connection pool) shared by every chatbot question, created on first use
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    The shared MongoClient, created lazily with the pool size and timeouts from Config.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(
+                    Config.MONGO_URI,
+                    tlsAllowInvalidCertificates=True,
+                    maxPoolSize=Config.CHATBOT_MAX_POOL_SIZE,
+                    connectTimeoutMS=Config.CHATBOT_CONNECT_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=Config.CHATBOT_SERVER_SELECTION_TIMEOUT_MS,
+                    socketTimeoutMS=Config.CHATBOT_SOCKET_TIMEOUT_MS,
+                )
+                print("Created the chatbot MongoDB client.")
+    return _client
 
 def connect_db():
     """
-    Connect to MongoDB.
+    The loginDB database on the shared client.
     """
     try:
-        client = MongoClient(Config.MONGO_URI, tlsAllowInvalidCertificates=True)
-        db = client["loginDB"]
-        print("Connected to MongoDB successfully.")
-        return db
+        return get_client()["loginDB"]
     except Exception as e:
         print("Error connecting to MongoDB:", str(e))
         return None
 
+def check_health():
+    """
+    Ping the server through the shared client. Returns (ok, error message or None).
+    """
+    try:
+        get_client().admin.command("ping")
+        return True, None
+    except Exception as e:
+        print("Chatbot MongoDB health check failed:", str(e))
+        return False, str(e)
+
+def close_client():
+    """
+    Close the shared client; the next connect_db() creates a new one.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over keyword phrases. find() reports the values of
+    every keyword occurring in a text in a single pass, however many keywords
+    are registered.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+
+    def add(self, keyword, value):
+        """
+        Register a keyword; call build() before matching.
+        """
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+                self._goto[node][char] = child
+            node = child
+        self._output[node].add(value)
+
+    def build(self):
+        """
+        Compute failure links breadth-first.
+        """
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] | self._output[self._fail[child]]
+
+    def find(self, text):
+        """
+        Set of values whose keywords occur in text.
+        """
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._output[node]:
+                found |= self._output[node]
+        return found
+
+
+# Names listed after "for"/"by", stopping before a trailing "on <day>" or punctuation
+USERNAME_PATTERN = re.compile(r"(?:for|by) ([\w, ]+?)(?=\s+on\s+\w+day\b|[^\w, ]|$)")
+DAY_PATTERN = re.compile(r"on (\w+day)")
+
+# Whole questions answered without a pipeline
+EXACT_QUESTIONS = {
+    "list faculty": "list_faculty",
+    "list all faculty members": "list_faculty",
+    "show faculty": "list_faculty",
+    "more": "more_faculty",
+    "more faculty": "more_faculty",
+    "next page": "more_faculty",
+}
+# "faculty starting with B", "list faculty members beginning with 'ben'"
+FACULTY_PREFIX_PATTERN = re.compile(r"^(?:list |show )?(?:all )?faculty(?: members)? (?:starting|beginning) with ['\"]?(.+?)['\"]?[?.]?$")
+
+# Intent name -> {'priority', 'builder', 'needs_usernames'}; see register_intent()
+INTENTS = {}
+_intent_matcher = KeywordMatcher()
+
+def register_intent(name, keywords, builder, priority=None, needs_usernames=True):
+    """
+    Route questions containing any of the keywords to builder(usernames, day),
+    which returns a pipeline or a fixed reply. When several intents match, the
+    lowest priority wins; by default intents rank in registration order.
+    """
+    INTENTS[name] = {
+        'priority': len(INTENTS) if priority is None else priority,
+        'builder': builder,
+        'needs_usernames': needs_usernames,
+    }
+    for keyword in keywords:
+        _intent_matcher.add(keyword.lower(), name)
+    _intent_matcher.build()
+
+def match_intent(question):
+    """
+    Name of the highest-priority intent whose keywords occur in the question, or None.
+    """
+    matched = _intent_matcher.find(question.lower())
+    if not matched:
+        return None
+    return min(matched, key=lambda name: INTENTS[name]['priority'])
+
+def extract_usernames(question):
+    match = USERNAME_PATTERN.search(question)
+    if not match:
+        return []
+    return [name.strip() for name in match.group(1).split(",") if name.strip()]
+
+def extract_day(question):
+    match = DAY_PATTERN.search(question)
+    return match.group(1).lower() if match else None
+
+def username_filter(usernames):
+    """
+    $match stage for the given usernames, case-insensitively, as an exact $in on
+    the indexed username_lower field.
+    """
+    return {"$match": {"username_lower": {"$in": sorted({name.lower() for name in usernames})}}}
+
+def total_hours_pipeline(usernames, day):
+    return [
+        username_filter(usernames),
+        {
+            "$group": {
+                "_id": "$username",
+                "totalHours": {"$sum": {"$toDouble": "$hoursWorked"}}
+            }
+        },
+        {"$project": {"_id": 0, "username": "$_id", "totalHours": 1}}
+    ]
+
+def date_range_pipeline(usernames, day):
+    # First and last day with a timesheet entry
+    return [
+        username_filter(usernames),
+        {
+            "$group": {
+                "_id": "$username",
+                "start_date": {"$min": "$date"},
+                "end_date": {"$max": "$date"}
+            }
+        },
+        {"$project": {"_id": 0, "username": "$_id", "start_date": 1, "end_date": 1}}
+    ]
+
+def course_pipeline(usernames, day):
+    query = [username_filter(usernames)]
+
+    # Handle specific day query if provided
+    if day:
+        query.append({"$match": {"day": {"$regex": f"^{day}$", "$options": "i"}}})
+
+    query.append({
+        "$project": {
+            "_id": 0,
+            "username": 1,
+            "courseCode": 1,
+            "day": 1
+        }
+    })
+    return query
+
+register_intent("help", ["login", "register"], lambda usernames, day: "Refer to the documentation for instructions.", needs_usernames=False)
+register_intent("total_hours", ["total hours", "working hours"], total_hours_pipeline)
+register_intent("date_range", ["start date", "end date"], date_range_pipeline)
+register_intent("courses", ["course code", "course"], course_pipeline)
+
+def route_question(question):
+    """
+    Classify the question in one pass over it. Returns (intent name or None,
+    MongoDB aggregation pipeline or a predefined response).
+    """
+    question = question.lower().strip()
+
+    if question in EXACT_QUESTIONS:
+        return EXACT_QUESTIONS[question], EXACT_QUESTIONS[question]
+    prefix_match = FACULTY_PREFIX_PATTERN.match(question)
+    if prefix_match:
+        return "faculty_prefix", prefix_match.group(1)
+
+    intent = match_intent(question)
+    if intent is None:
+        return None, "Error: Invalid question type."
+
+    spec = INTENTS[intent]
+    usernames = extract_usernames(question)
+    if spec['needs_usernames'] and not usernames:
+        return intent, "Error: Please name a faculty member, e.g. 'total hours for Jane Doe'."
+    return intent, spec['builder'](usernames, extract_day(question))
+
 def parse_user_question(question):
     """
     Analyze the user question and determine the kind of query to generate.
     Returns the corresponding MongoDB aggregation query or a predefined response.
     """
-    question = question.lower()
-    
-    if question in ["list faculty", "list all faculty members", "show faculty"]:
-        return "list_faculty"
-    
-    if "login" in question or "register" in question:
-        return "Refer to the documentation for instructions."
-    
-    # Extract usernames
-    match = re.search(r"(?:for|by) ([\w, ]+)", question)
-    usernames = [name.strip() for name in match.group(1).split(",")] if match else None
-    
-    # Matching case-insensitive username 
-    regex_usernames = [{"username" : {"$regex": f"^{re.escape(name)}$", "$options": "i"}} for name in usernames]
+    return route_question(question)[1]
 
-    # Specific day extraction
-    day_match = re.search(r"on (\w+day)", question)
-    specific_day = day_match.group(1).lower() if day_match else None
-    
+# Faculty roster of the chatbot's database, created on first use
+_roster = None
 
-    # Query for total working hours
-    if "total hours" in question or "working hours" in question:
-        return [
-            {"$match": {"$or": regex_usernames}},
-            {"$unwind": "$timesheets"},
-            {"$unwind": "$timesheets.week1"},
-            {
-                "$group": {
-                    "_id": "$username",
-                    "totalHours": {"$sum": {"$toDouble": "$timesheets.week1.hoursWorked"}}
-                }
-            },
-            {"$project": {"_id": 0, "username": "$_id", "totalHours": 1}}
-        ]
-    
-    # Query for start date and end date
-    elif "start date" in question or "end date" in question:
-        return [
-            {"$match": {"$or": regex_usernames}},
-            {"$unwind": "$timesheets"},
-            {
-                "$project": {
-                    "_id": 0,
-                    "username": 1,
-                    "start_date": "$timesheets.startDate",
-                    "end_date": "$timesheets.endDate"
-                }
-            }
-        ]
-    
-    # Query for course codes
-    elif "course code" in question or "course" in question:
-        query = [
-            {"$match": {"$or": regex_usernames}},
-            {"$unwind": "$timesheets"},
-            {"$unwind": "$timesheets.week1"},
-        ]
-        
-        # Handle specific day query if provided
-        if specific_day:
-            query.append({"$match": {"timesheets.week1.day": {"$regex": f"^{specific_day}$", "$options": "i"}}})
-        
-        query.append({
-            "$project": {
-                "_id": 0,
-                "username": 1,
-                "courseCode": "$timesheets.week1.courseCode",
-                "day": "$timesheets.week1.day"
-            }
-        })
-        
-        return query
-    else:
-        return "Error: Invalid question type."
+def get_roster(db):
+    global _roster
+    if _roster is None:
+        _roster = FacultyRoster(db, Config.ROSTER_TTL_SECONDS, Config.ROSTER_PAGE_SIZE)
+    return _roster
 
-def list_all_faculty_members(db):
+def list_all_faculty_members(db, state=None):
     """
-    Fetch and display all unique faculty member names from the database.
+    Display the first page of faculty member names from the cached roster snapshot.
+    state is a dict kept across one conversation's questions (e.g. the Flask
+    session); it remembers where the next page starts for a "more" question.
     """
     try:
-        # Query to get distinct usernames
-        faculty_names = db.users.distinct("username")
+        faculty_names, next_cursor, total = get_roster(db).snapshot()
         if not faculty_names:
             return "No faculty members found."
-        
-        formatted_names = "\n".join(faculty_names)
-        return f"List of Faculty Members:\n{formatted_names}"
+        return faculty_page_reply(faculty_names, next_cursor, None, state, total - len(faculty_names))
+    except Exception as e:
+        print("Error fetching faculty names:", str(e))
+        return "Error: Could not fetch faculty member names."
+
+def list_faculty_members_starting_with(db, prefix, state=None):
+    """
+    Display the first page of faculty member names starting with prefix.
+    """
+    try:
+        faculty_names, next_cursor = get_roster(db).page(prefix=prefix)
+        if not faculty_names:
+            return f"No faculty members found starting with '{prefix}'."
+        return faculty_page_reply(faculty_names, next_cursor, prefix, state)
+    except Exception as e:
+        print("Error fetching faculty names:", str(e))
+        return "Error: Could not fetch faculty member names."
+
+def list_more_faculty_members(db, state):
+    """
+    Display the page after the last one listed in this conversation.
+    """
+    listing = (state or {}).get('faculty_page')
+    if not listing or listing.get('after') is None:
+        return "No more faculty members to show. Ask 'list faculty' to start over."
+    try:
+        faculty_names, next_cursor = get_roster(db).page(listing['after'], listing.get('prefix'))
+        if not faculty_names:
+            return "No more faculty members to show. Ask 'list faculty' to start over."
+        return faculty_page_reply(faculty_names, next_cursor, listing.get('prefix'), state)
     except Exception as e:
         print("Error fetching faculty names:", str(e))
         return "Error: Could not fetch faculty member names."
+
+def answer_faculty_question(db, intent, query, state):
+    """
+    Reply to a roster intent from route_question(): list_faculty, more_faculty
+    or faculty_prefix (whose query is the prefix).
+    """
+    if intent == "faculty_prefix":
+        return list_faculty_members_starting_with(db, query, state)
+    if intent == "more_faculty":
+        return list_more_faculty_members(db, state)
+    return list_all_faculty_members(db, state)
+
+def faculty_page_reply(faculty_names, next_cursor, prefix, state, remaining=None):
+    """
+    Format one page of faculty names and remember where the next page starts.
+    """
+    if state is not None:
+        state['faculty_page'] = {'after': next_cursor, 'prefix': prefix}
+    formatted_names = "\n".join(faculty_names)
+    if next_cursor is not None:
+        more = f"...and {remaining} more" if remaining else "...and more"
+        formatted_names += f"\n{more}. Ask 'more' for the next page."
+    return f"List of Faculty Members:\n{formatted_names}"
     
-def execute_query(db, query):
+class ResultCache:
+    """
+    Aggregation results keyed by the canonical JSON of their pipeline, expiring
+    after ttl_seconds and evicted least-recently-used beyond max_entries.
+    Entries are tagged with the (lowercase) usernames they cover, so a timesheet
+    write only drops the answers about that user; untagged entries are dropped
+    on every write.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, usernames or None, results)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(pipeline):
+        """
+        Canonical form of a pipeline: key order and whitespace don't matter.
+        """
+        return json.dumps(pipeline, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[2])
+
+    def put(self, key, results, usernames=None):
+        tags = None if usernames is None else frozenset(name.lower() for name in usernames)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tags, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_usernames(self, usernames):
+        """
+        Drop the cached results that cover any of these users.
+        """
+        names = {name.lower() for name in usernames}
+        with self._lock:
+            stale = [key for key, (_, tags, _) in self._entries.items() if tags is None or tags & names]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Chatbot answers shared by every request of this process
+result_cache = ResultCache(Config.CHATBOT_CACHE_SIZE, Config.CHATBOT_CACHE_TTL_SECONDS)
+
+def execute_query(db, query, usernames=None):
     """
-    Execute the MongoDB query and return the results.
+    Execute the MongoDB query against the timesheet entries and return the results.
+    Results are served from result_cache when the same pipeline ran recently;
+    usernames tags the cached results for invalidate_usernames().
     """
     try:
         if isinstance(query, str) and query.startswith("Error"):
             return query 
-        results = db.users.aggregate(query)
-        return list(results)
+        key = ResultCache.key(query)
+        results = result_cache.get(key)
+        if results is None:
+            results = list(db[ENTRIES_COLLECTION].aggregate(query))
+            result_cache.put(key, results, usernames)
+        return results
     except Exception as e:
         print("Error in executing query:", str(e))
         return None
@@ -131,21 +435,22 @@ def format_results(results, question):
     if not results:
         return "No records found."
 
+    intent = match_intent(question)
     formatted_results = []
     for result in results:
-        if "total hours" in question or "working hours" in question:
+        if intent == "total_hours":
             if len(results) == 1:
                 formatted_results.append(f"Total Hours: {result.get('totalHours', 'N/A')}")
             else:
                 formatted_results.append(f"Username: {result.get('username', 'N/A')}\nTotal Hours: {result.get('totalHours', 'N/A')}")
-        elif "course code" in question or "course" in question:
+        elif intent == "courses":
             course_code = result.get("courseCode", "N/A")
             day = result.get("day", "N/A")
             if course_code != "N/A":
                 formatted_results.append(f"Username: {result.get('username', 'N/A')}, Course Code: {course_code}, Day: {day}")
             else:
                 formatted_results.append(f"Username: {result.get('username', 'N/A')}, Course Code: Not Found")
-        elif "start date" in question or "end date" in question:
+        elif intent == "date_range":
             formatted_results.append(f"Start Date: {result.get('start_date', 'N/A')}, End Date: {result.get('end_date', 'N/A')}")
         else:
             formatted_result = "\n".join([f"{key}: {value}" for key, value in result.items()])
@@ -162,6 +467,7 @@ def chatbot():
         return
 
     print("Chatbot is ready! Ask your questions.")
+    state = {}
 
     while True:
         user_question = input("\nYOU: ").strip()
@@ -171,11 +477,11 @@ def chatbot():
             break
 
         print("Chatbot is analyzing your question...")
-        query = parse_user_question(user_question)
+        intent, query = route_question(user_question)
         
-        if query == "list_faculty":
+        if intent in ("list_faculty", "more_faculty", "faculty_prefix"):
             print("CHATBOT: Fetching faculty member names...")
-            faculty_list = list_all_faculty_members(db)
+            faculty_list = answer_faculty_question(db, intent, query, state)
             print(f"CHATBOT:\n{faculty_list}")
             continue
 
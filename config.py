@@ -7,3 +7,18 @@ load_dotenv()
 class Config:
     MONGO_URI = os.getenv('MONGO_URI')  # Fetch MONGO_URI from .env
     SECRET_KEY = os.getenv('SECRET_KEY')  # Fetch SECRET_KEY from .env
+    SCHEDULE_DIR = os.getenv('SCHEDULE_DIR')  # Directory with term schedule workbooks (defaults to ./static)
+    SCHEDULE_TERM = os.getenv('SCHEDULE_TERM', 'Sample_Fall 2024')  # Default term, i.e. workbook name without .xlsx
+    SCHEDULE_CACHE_DIR = os.getenv('SCHEDULE_CACHE_DIR')  # Where parsed schedule sidecars are kept (defaults to ./.schedule_cache)
+    ROLE_RECHECK_SECONDS = int(os.getenv('ROLE_RECHECK_SECONDS', 10))  # How long a role cached in the session is trusted before its version is checked again
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # bcrypt work factor; stored hashes with another cost are rehashed on login
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', max(1, (os.cpu_count() or 2) // 2)))  # Threads hashing passwords; half the cores leaves the rest for requests
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 64))  # Hash/verify calls queued or running before logins wait
+    CHATBOT_MAX_POOL_SIZE = int(os.getenv('CHATBOT_MAX_POOL_SIZE', 10))  # Connections in the chatbot's shared MongoDB pool
+    CHATBOT_CONNECT_TIMEOUT_MS = int(os.getenv('CHATBOT_CONNECT_TIMEOUT_MS', 5000))
+    CHATBOT_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('CHATBOT_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    CHATBOT_SOCKET_TIMEOUT_MS = int(os.getenv('CHATBOT_SOCKET_TIMEOUT_MS', 10000))
+    CHATBOT_CACHE_SIZE = int(os.getenv('CHATBOT_CACHE_SIZE', 256))  # Chatbot aggregation results kept per process
+    CHATBOT_CACHE_TTL_SECONDS = int(os.getenv('CHATBOT_CACHE_TTL_SECONDS', 60))  # Bounds staleness of writes made by other processes
+    ROSTER_PAGE_SIZE = int(os.getenv('ROSTER_PAGE_SIZE', 50))  # Faculty names per roster page
+    ROSTER_TTL_SECONDS = int(os.getenv('ROSTER_TTL_SECONDS', 30))  # How long the cached first roster page is served
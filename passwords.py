@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import bcrypt
+
+
+class PasswordServiceBusy(Exception):
+    """
+    Raised when the hashing queue stays full for longer than the wait timeout.
+    """
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a bounded thread pool.
+
+    The calling request thread still waits for its result; the pool bounds
+    how many bcrypt operations run at once, so a burst of logins cannot take
+    every core away from other requests. bcrypt releases the GIL while it
+    works, so the workers run in parallel. At most max_pending operations are
+    queued or running; callers wait up to wait_timeout seconds for a slot and
+    then get PasswordServiceBusy.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=64, wait_timeout=10.0):
+        self.rounds = rounds
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {'hash': [0, 0.0, 0.0], 'verify': [0, 0.0, 0.0]}  # kind -> [count, total ms, max ms]
+        self._rejected = 0
+
+    def hash(self, password):
+        """
+        bcrypt hash of a str password at the configured cost.
+        """
+        return self._run('hash', bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+
+    def verify(self, password, hashed):
+        """
+        True when the str password matches the stored hash.
+        """
+        return self._run('verify', bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, hashed):
+        """
+        True when the stored hash was made with a different cost than the configured one.
+        """
+        try:
+            return int(hashed.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def metrics(self):
+        """
+        Queue depth, running operations and timing per operation kind.
+        """
+        with self._lock:
+            metrics = {
+                'rounds': self.rounds,
+                'queued': self._queued,
+                'running': self._running,
+                'rejected': self._rejected,
+            }
+            for kind, (count, total_ms, max_ms) in self._stats.items():
+                metrics[kind] = {
+                    'count': count,
+                    'avg_ms': round(total_ms / count, 1) if count else 0.0,
+                    'max_ms': round(max_ms, 1),
+                }
+        return metrics
+
+    def shutdown(self):
+        """
+        Wait for queued operations and stop the worker threads.
+        """
+        self._executor.shutdown(wait=True)
+
+    def _run(self, kind, func, *args):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordServiceBusy("Password service is busy")
+        with self._lock:
+            self._queued += 1
+        try:
+            return self._executor.submit(self._timed, kind, func, *args).result()
+        finally:
+            self._slots.release()
+
+    def _timed(self, kind, func, *args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._running -= 1
+                stats = self._stats[kind]
+                stats[0] += 1
+                stats[1] += elapsed_ms
+                stats[2] = max(stats[2], elapsed_ms)
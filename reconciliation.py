@@ -0,0 +1,335 @@
+from datetime import datetime
+from io import StringIO
+import csv
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+from pymongo import ASCENDING, DeleteMany, InsertOne
+from pymongo.errors import DuplicateKeyError
+from schedule import normalize_name
+from timesheet_store import ENTRIES_COLLECTION
+from user_store import ROSTER_PROJECTION, TIMESHEET_PROJECTION
+
+# Columns of the flattened timesheet frame, one row per submitted entry
+ENTRY_COLUMNS = ["faculty", "status", "date", "day", "course_code", "hours_worked", "comments"]
+
+
+def entries_frame(rows):
+    """
+    Build the flattened entry frame from (faculty, status, date, day, course_code,
+    hours_worked, comments) tuples or dicts with those keys.
+    """
+    entries = pd.DataFrame.from_records(list(rows), columns=ENTRY_COLUMNS)
+    entries['entry_date'] = pd.to_datetime(entries['date'], format="%Y-%m-%d", errors='coerce')
+    entries['hours_worked'] = pd.to_numeric(entries['hours_worked'], errors='coerce').fillna(0.0).astype(float)
+    return entries
+
+
+def load_timesheet_entries(db, from_date=None, to_date=None, usernames=None):
+    """
+    Flattened faculty timesheet entries within the date range. The range is
+    applied in MongoDB on the indexed timesheet_entries.date field, so only
+    in-range entries are transferred and parsed.
+    """
+    faculty_query = {'role': 'Faculty'}
+    entry_query = {}
+    if usernames is not None:
+        faculty_query['username'] = {'$in': list(usernames)}
+        entry_query['username'] = {'$in': list(usernames)}
+    date_range = {}
+    if from_date:
+        date_range['$gte'] = from_date.strftime("%Y-%m-%d")
+    if to_date:
+        date_range['$lte'] = to_date.strftime("%Y-%m-%d")
+    if date_range:
+        entry_query['date'] = date_range
+
+    statuses = {
+        faculty['username']: faculty.get('status', '✗')
+        for faculty in db['users'].find(faculty_query, ROSTER_PROJECTION)
+    }
+    rows = (
+        (entry['username'], statuses[entry['username']], entry.get('date'), entry.get('day'),
+         entry.get('courseCode'), entry.get('hoursWorked'), entry.get('comments'))
+        for entry in db[ENTRIES_COLLECTION].find(entry_query, TIMESHEET_PROJECTION)
+        if entry['username'] in statuses
+    )
+    return entries_frame(rows)
+
+
+def reconcile_entries(entries, schedule_index, from_date=None, to_date=None):
+    """
+    Merge-join the flattened entries against the schedule on instructor, date and
+    course, and compute scheduled hours, the hours delta and a per-entry ✓/✗.
+    """
+    mask = entries['entry_date'].notna()
+    if from_date:
+        mask &= entries['entry_date'] >= pd.Timestamp(from_date)
+    if to_date:
+        mask &= entries['entry_date'] <= pd.Timestamp(to_date)
+    entries = entries.loc[mask]
+
+    keyed = entries.assign(
+        instructor=entries['faculty'].map(normalize_name),
+        course=entries['course_code'].map(normalize_name),
+    )
+    schedule = schedule_index.as_frame().rename(columns={'date': 'entry_date'})
+    reconciled = keyed.merge(schedule, how='left', on=['instructor', 'entry_date', 'course'])
+
+    scheduled = reconciled['scheduled_hours'].to_numpy()
+    claimed = reconciled['hours_worked'].to_numpy()
+    reconciled['scheduled'] = ~np.isnan(scheduled)
+    reconciled['scheduled_hours'] = np.nan_to_num(scheduled)
+    reconciled['delta'] = claimed - reconciled['scheduled_hours'].to_numpy()
+    reconciled['matched'] = reconciled['scheduled'].to_numpy() & np.isclose(reconciled['delta'].to_numpy(), 0.0)
+    reconciled['entry_status'] = np.where(reconciled['matched'], '✓', '✗')
+    return reconciled.drop(columns=['instructor', 'course'])
+
+
+def summarize_reconciliation(reconciled):
+    """
+    Roll reconciled entries up to one finance row per faculty member.
+    A faculty member is ✓ when finance approved them or every entry matches the schedule.
+    Returns (transactions, messages) in the shape finance.html expects.
+    """
+    missing = reconciled.loc[~reconciled['scheduled'], ['faculty', 'date', 'course_code']]
+    messages = [
+        f"No schedule entry found for {faculty_name} on {date} for course {course_code}"
+        for faculty_name, date, course_code in missing.itertuples(index=False)
+    ]
+
+    summary = reconciled.groupby('faculty', sort=False).agg(
+        hours=('hours_worked', 'sum'),
+        stored_status=('status', 'first'),
+        all_matched=('matched', 'all'),
+    )
+    summary = summary[summary['hours'] > 0]
+    statuses = np.where((summary['stored_status'] == '✓') | summary['all_matched'], '✓', '✗')
+
+    transactions = [
+        {
+            "Faculty Name": faculty_name,
+            "Hours Worked": format_hours(hours),
+            "Status": str(status),
+        }
+        for faculty_name, hours, status in zip(summary.index, summary['hours'], statuses)
+    ]
+    return transactions, messages
+
+
+# Columns stored per entry in the faculty_reconciliation collection
+SUMMARY_COLUMNS = [
+    "faculty", "status", "date", "day", "course_code", "hours_worked", "comments",
+    "scheduled_hours", "delta", "scheduled", "matched",
+]
+
+
+# Columns of the downloadable finance report, one row per timesheet entry
+REPORT_COLUMNS = ["Faculty Name", "Date", "Course Code", "Hours Worked", "Scheduled Hours", "Delta", "Approval", "Status"]
+
+
+def iter_report_csv(rows, batch_size=500):
+    """
+    Yield the finance report as CSV text chunks from reconciliation rows,
+    writing batch_size rows at a time so memory stays flat for any report size.
+    Approval is finance's ✓/✗ decision; like the /finance page, an approved
+    entry counts as matched in Status.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([
+            row.get('faculty'),
+            row.get('date'),
+            row.get('course_code'),
+            format_hours(row.get('hours_worked') or 0),
+            format_hours(row.get('scheduled_hours') or 0),
+            format_hours(row.get('delta') or 0),
+            "Approved" if row.get('status') == '✓' else "Not Approved",
+            "Hours Matched" if row.get('status') == '✓' or row.get('matched') else "Hours Unmatched",
+        ])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class ReconciliationStore:
+    """
+    Materialized reconciliation rows, one document per timesheet entry and term,
+    kept in the faculty_reconciliation collection.
+
+    Rows are rebuilt in full when a term's schedule changes and refreshed
+    incrementally for just the affected (faculty, date, course) keys when a
+    timesheet is submitted, so finance pages only read precomputed rows.
+
+    Every rebuild writes its rows under a new build id and then swaps the term's
+    reconciliation_state document to that id with a compare-and-set, so readers
+    only ever see one complete build and concurrent rebuilds cannot mix or
+    duplicate rows: the loser of the swap deletes its own rows.
+    """
+
+    def __init__(self, db, collection_name='faculty_reconciliation'):
+        self.rows = db[collection_name]
+        self.state = db['reconciliation_state']
+        self._indexed = False
+
+    def ensure_indexes(self):
+        """
+        Indexes for date-range reads and per-entry refreshes. Created once per process.
+        """
+        if not self._indexed:
+            self.rows.create_index([('term', ASCENDING), ('build', ASCENDING), ('date', ASCENDING)])
+            self.rows.create_index([('term', ASCENDING), ('build', ASCENDING), ('faculty', ASCENDING), ('date', ASCENDING), ('course_code', ASCENDING)])
+            self._indexed = True
+
+    def is_current(self, term, schedule_version):
+        """
+        True when the term's rows were built against this schedule version.
+        """
+        state = self.state.find_one({'_id': term})
+        return bool(state) and state.get('schedule_version') == schedule_version
+
+    def current_terms(self):
+        """
+        Terms that have materialized rows, with the schedule version they were built from.
+        """
+        return {state['_id']: state.get('schedule_version') for state in self.state.find()}
+
+    def current_build(self, term):
+        """
+        Build id of the term's live rows (None for rows written before builds were versioned).
+        """
+        state = self.state.find_one({'_id': term}, {'build': 1})
+        return state.get('build') if state else None
+
+    def rebuild(self, term, snapshot, entries):
+        """
+        Recompute every row of a term from flattened timesheet entries.
+        Returns False when a concurrent rebuild swapped in its rows first.
+        """
+        self.ensure_indexes()
+        reconciled = reconcile_entries(entries, snapshot.index)
+        previous_build = self.current_build(term)
+        build = ObjectId()
+        documents = self._documents(term, snapshot.version, reconciled, build)
+        if documents:
+            self.rows.insert_many(documents, ordered=False)
+
+        # Swap only if nobody else has since the previous build was read
+        try:
+            swapped = self.state.update_one(
+                {'_id': term, 'build': previous_build},
+                {'$set': {'build': build, 'schedule_version': snapshot.version, 'built_at': datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            swapped = None
+        if swapped is None or not (swapped.matched_count or swapped.upserted_id):
+            self.rows.delete_many({'term': term, 'build': build})
+            return False
+        self.rows.delete_many({'term': term, 'build': previous_build})
+        return True
+
+    def refresh(self, term, snapshot, faculty_name, entries, keys):
+        """
+        Recompute only the rows of one faculty member for the given (date, course_code) keys.
+        entries are that faculty member's flattened entries (extra keys are ignored).
+        Returns False when the term's live rows are no longer built from this
+        snapshot's schedule version, so the caller can retry with a newer snapshot.
+        """
+        self.ensure_indexes()
+        keys = {(date, course_code) for date, course_code in keys}
+        if not keys:
+            return True
+        entries = entries[[
+            faculty == faculty_name and (date, course_code) in keys
+            for faculty, date, course_code in zip(entries['faculty'], entries['date'], entries['course_code'])
+        ]]
+        reconciled = reconcile_entries(entries, snapshot.index)
+
+        while True:
+            state = self.state.find_one({'_id': term}, {'build': 1, 'schedule_version': 1})
+            if not state or state.get('schedule_version') != snapshot.version:
+                return False
+            build = state.get('build')
+            requests = [
+                DeleteMany({'term': term, 'build': build, 'faculty': faculty_name, 'date': date, 'course_code': course_code})
+                for date, course_code in sorted(keys)
+            ]
+            requests += [InsertOne(document) for document in self._documents(term, snapshot.version, reconciled, build)]
+            self.rows.bulk_write(requests, ordered=True)
+            # A rebuild that loaded its entries before these were saved may have
+            # swapped in meanwhile and deleted the rows just written; redo them there
+            if self.current_build(term) == build:
+                return True
+
+    def expire(self):
+        """
+        Mark every term's rows out of date so they are rebuilt on their next read.
+        """
+        self.state.update_many({}, {'$unset': {'schedule_version': ''}})
+
+    def drop_term(self, term):
+        """
+        Forget a term's rows, e.g. once its schedule workbook is gone.
+        """
+        self.state.delete_one({'_id': term})
+        self.rows.delete_many({'term': term})
+
+    def set_status(self, faculty_name, status):
+        """
+        Record finance's ✓/✗ decision on every row of a faculty member.
+        """
+        self.rows.update_many({'faculty': faculty_name}, {'$set': {'status': status}})
+
+    def find_rows(self, term, from_date=None, to_date=None):
+        """
+        Cursor over a term's live rows, optionally limited to a date range (inclusive).
+        """
+        query = {'term': term, 'build': self.current_build(term)}
+        date_range = {}
+        if from_date:
+            date_range['$gte'] = from_date.strftime("%Y-%m-%d")
+        if to_date:
+            date_range['$lte'] = to_date.strftime("%Y-%m-%d")
+        if date_range:
+            query['date'] = date_range
+        projection = {column: 1 for column in SUMMARY_COLUMNS}
+        projection['_id'] = 0
+        return self.rows.find(query, projection).sort([('faculty', ASCENDING), ('date', ASCENDING)])
+
+    def summary(self, term, from_date=None, to_date=None):
+        """
+        Finance rows and messages for a term, read from the materialized rows.
+        """
+        reconciled = pd.DataFrame(list(self.find_rows(term, from_date, to_date)), columns=SUMMARY_COLUMNS)
+        if reconciled.empty:
+            return [], []
+        reconciled['scheduled'] = reconciled['scheduled'].astype(bool)
+        reconciled['matched'] = reconciled['matched'].astype(bool)
+        return summarize_reconciliation(reconciled)
+
+    @staticmethod
+    def _documents(term, schedule_version, reconciled, build=None):
+        """
+        Reconciled frame -> plain documents for Mongo.
+        """
+        frame = reconciled[SUMMARY_COLUMNS].astype(object)
+        frame = frame.where(frame.notna(), None)
+        documents = frame.to_dict('records')
+        for document in documents:
+            document['term'] = term
+            document['schedule_version'] = schedule_version
+            document['build'] = build
+        return documents
+
+
+def format_hours(hours):
+    """
+    Show whole hours without a trailing '.0'.
+    """
+    hours = float(hours)
+    return int(hours) if hours.is_integer() else round(hours, 2)
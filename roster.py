@@ -0,0 +1,111 @@
+import threading
+import time
+from bson import ObjectId
+from pymongo import ASCENDING
+
+
+class FacultyRoster:
+    """
+    Faculty usernames read in pages ordered by (username_lower, _id), served by the
+    (role, username_lower, _id) index. Pages are addressed by a cursor naming the
+    last document of the previous page rather than skip, so every page costs the
+    same however deep it is; the _id tie-break keeps names that differ only in
+    case from being skipped.
+
+    snapshot() keeps the first page and the faculty count for ttl_seconds, so
+    the default listing doesn't query at all between refreshes.
+    """
+
+    def __init__(self, db, ttl_seconds=30, page_size=50, role='Faculty'):
+        self.users = db['users']
+        self.ttl_seconds = ttl_seconds
+        self.page_size = page_size
+        self.role = role
+        self._indexed = False
+        self._snapshot = None  # (expires_at, usernames, next cursor, total)
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self):
+        """
+        Role + name index behind every roster read. Created once per process.
+        """
+        if not self._indexed:
+            self.users.create_index(
+                [('role', ASCENDING), ('username_lower', ASCENDING), ('_id', ASCENDING)],
+                name='role_username_lower_id',
+            )
+            self._indexed = True
+
+    def page(self, after=None, prefix=None, limit=None):
+        """
+        One page of faculty usernames. Returns (usernames, next cursor or None).
+        prefix limits the page to names starting with it, case-insensitively.
+        Raises bson.errors.InvalidId for a malformed cursor.
+        """
+        self.ensure_indexes()
+        limit = limit or self.page_size
+        query = {'role': self.role}
+        if prefix:
+            prefix = prefix.lower()
+            query['username_lower'] = {'$gte': prefix, '$lt': prefix + '\uffff'}
+        if after is not None:
+            query['$or'] = _after_cursor(after)
+
+        documents = list(
+            self.users.find(query, {'username': 1, 'username_lower': 1})
+            .sort([('username_lower', ASCENDING), ('_id', ASCENDING)])
+            .limit(limit + 1)
+        )
+        next_cursor = _cursor(documents[limit - 1]) if len(documents) > limit else None
+        return [document['username'] for document in documents[:limit]], next_cursor
+
+    def count(self):
+        """
+        Number of faculty members, counted on the role index.
+        """
+        self.ensure_indexes()
+        return self.users.count_documents({'role': self.role})
+
+    def snapshot(self):
+        """
+        (first page of usernames, cursor of the second page, total faculty count),
+        refreshed after ttl_seconds.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] > time.monotonic():
+            return snapshot[1:]
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot[0] <= time.monotonic():
+                usernames, next_cursor = self.page()
+                snapshot = (time.monotonic() + self.ttl_seconds, usernames, next_cursor, self.count())
+                self._snapshot = snapshot
+        return snapshot[1:]
+
+    def invalidate(self):
+        """
+        Drop the cached snapshot, e.g. after a role change.
+        """
+        self._snapshot = None
+
+
+def _cursor(document):
+    """
+    Cursor naming a roster document: its _id, then ':' and its username_lower
+    when it has one.
+    """
+    if document.get('username_lower') is None:
+        return str(document['_id'])
+    return f"{document['_id']}:{document['username_lower']}"
+
+
+def _after_cursor(cursor):
+    """
+    $or clauses matching the documents ordered after the cursor's document.
+    Documents still missing username_lower sort before every name.
+    """
+    object_id, has_name, username_lower = cursor.partition(':')
+    object_id = ObjectId(object_id)
+    if not has_name:
+        return [{'username_lower': {'$type': 'string'}}, {'username_lower': None, '_id': {'$gt': object_id}}]
+    return [{'username_lower': {'$gt': username_lower}}, {'username_lower': username_lower, '_id': {'$gt': object_id}}]
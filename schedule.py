@@ -0,0 +1,475 @@
+from datetime import datetime, time as time_of_day
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+def normalize_name(value):
+    """
+    Normalize an instructor name or course code for lookups (trimmed, lowercase).
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value).strip().lower()
+
+
+def course_prefix(subject):
+    """
+    Returns the course code part of an Excel subject, e.g.
+    'SUST1002 - Sustainability & CSR' -> 'sust1002'.
+    """
+    return normalize_name(str(subject).split(" - ", 1)[0]) if subject is not None else ""
+
+
+# Weekday abbreviations used in the 'Days of the Week' column (Monday == 0)
+WEEKDAY_CODES = {"m": 0, "t": 1, "tu": 1, "w": 2, "th": 3, "f": 4, "sa": 5, "su": 6}
+_WEEKDAY_TOKEN = re.compile(r"th|tu|sa|su|m|t|w|f")
+
+
+def parse_days_of_week(days):
+    """
+    Parse a meeting pattern such as 'F', 'M,W', 'T, Th' or 'TTh' into sorted
+    weekday numbers (Monday == 0). Raises ValueError on unknown abbreviations.
+    """
+    text = normalize_name(days)
+    tokens = _WEEKDAY_TOKEN.findall(text)
+    leftover = re.sub(r"[\s,/&]+", "", _WEEKDAY_TOKEN.sub("", text))
+    if not tokens or leftover:
+        raise ValueError(f"Invalid weekday abbreviation: {days!r}")
+    return sorted({WEEKDAY_CODES[token] for token in tokens})
+
+
+def meeting_dates(start_date, end_date, weekdays):
+    """
+    All dates from start_date to end_date (inclusive) falling on the given weekday
+    numbers, as a sorted datetime64[D] array.
+    """
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekday = (days.astype('int64') + 3) % 7
+    return days[np.isin(weekday, weekdays)]
+
+
+def _to_day(date):
+    """
+    Convert a date, datetime, Timestamp or 'YYYY-MM-DD' string to datetime64[D].
+    """
+    if isinstance(date, pd.Timestamp):
+        date = date.to_pydatetime()
+    return np.datetime64(date, 'D')
+
+
+def _parse_times(column):
+    """
+    Parse an Excel time column (datetime.time, 'HH:MM:SS' strings, or timedeltas
+    since midnight as loaded from a ScheduleCache sidecar) into timedeltas.
+    """
+    if pd.api.types.is_timedelta64_dtype(column):
+        return column
+    return pd.to_timedelta(column.astype(str), errors='coerce')
+
+
+class ScheduleSnapshot:
+    """
+    Normalized, read-only view of the 'Activities - Groups' sheet.
+
+    Everything the finance checks need is computed once at load time: lowercase
+    instructor/subject/course keys, typed Start/End Date (datetime64) and
+    Start/End Time (datetime.time) columns and per-class durations. A snapshot is
+    never modified after construction; a new schedule means a new snapshot, so
+    concurrent requests can read it without locking.
+    """
+
+    def __init__(self, frame, version=None):
+        self._frame = frame
+        self.version = version
+        self._index = None
+        self._occurrences = None
+
+    @classmethod
+    def from_excel(cls, excel_data, version=None):
+        """
+        Normalize a raw sheet as returned by pd.read_excel().
+        version identifies the source (e.g. the workbook's content hash).
+        """
+        frame = excel_data.copy()
+        frame.columns = frame.columns.str.strip()
+
+        start_time = _parse_times(frame['Start Time'])
+        end_time = _parse_times(frame['End Time'])
+        midnight = pd.Timestamp(0)
+
+        frame['Start Date'] = pd.to_datetime(frame['Start Date'], format='%m/%d/%Y', errors='coerce')
+        frame['End Date'] = pd.to_datetime(frame['End Date'], format='%m/%d/%Y', errors='coerce')
+        frame['Start Time'] = (midnight + start_time).dt.time
+        frame['End Time'] = (midnight + end_time).dt.time
+        frame['Days of the Week'] = frame['Days of the Week'].astype(str).str.strip()
+        frame['instructor_key'] = frame['Instructor'].map(normalize_name)
+        frame['subject_key'] = frame['Subject'].map(normalize_name)
+        frame['course_key'] = frame['Subject'].map(course_prefix)
+        frame['class_hours'] = (end_time - start_time).dt.total_seconds() / 3600
+        # Billed hours are rounded up to whole hours
+        frame['billed_hours'] = np.ceil(frame['class_hours'])
+        return cls(frame, version)
+
+    @property
+    def frame(self):
+        """
+        The normalized frame. Treat as read-only.
+        """
+        return self._frame
+
+    @property
+    def index(self):
+        """
+        The (instructor, date, course) lookup index for this snapshot, built on first use.
+        """
+        if self._index is None:
+            self._index = ScheduleIndex.from_snapshot(self)
+        return self._index
+
+    @property
+    def occurrences(self):
+        """
+        One row per class meeting (instructor_key, course_key, date, billed_hours),
+        expanded from each class's date range and meeting pattern. Built on first use.
+        Classes with missing dates or an unknown meeting pattern are skipped.
+        """
+        if self._occurrences is None:
+            classes = self._frame.dropna(subset=['Start Date', 'End Date', 'billed_hours'])
+            instructors, courses, dates, hours = [], [], [], []
+            rows = zip(
+                classes['instructor_key'], classes['course_key'], classes['Start Date'],
+                classes['End Date'], classes['Days of the Week'], classes['billed_hours'],
+            )
+            for instructor, course, start_date, end_date, days, billed_hours in rows:
+                try:
+                    weekdays = parse_days_of_week(days)
+                except ValueError:
+                    continue
+                class_dates = meeting_dates(_to_day(start_date), _to_day(end_date), weekdays)
+                instructors.append(np.full(len(class_dates), instructor, dtype=object))
+                courses.append(np.full(len(class_dates), course, dtype=object))
+                dates.append(class_dates)
+                hours.append(np.full(len(class_dates), billed_hours))
+            self._occurrences = pd.DataFrame({
+                'instructor_key': np.concatenate(instructors) if instructors else np.array([], dtype=object),
+                'course_key': np.concatenate(courses) if courses else np.array([], dtype=object),
+                'date': np.concatenate(dates) if dates else np.array([], dtype='datetime64[D]'),
+                'billed_hours': np.concatenate(hours) if hours else np.array([], dtype=float),
+            })
+        return self._occurrences
+
+    @property
+    def date_range(self):
+        """
+        (first, last) class date of the term as datetimes, or (None, None) when empty.
+        """
+        first, last = self._frame['Start Date'].min(), self._frame['End Date'].max()
+        if pd.isna(first) or pd.isna(last):
+            return None, None
+        return first.to_pydatetime(), last.to_pydatetime()
+
+    def __len__(self):
+        return len(self._frame)
+
+
+class ScheduleIndex:
+    """
+    Scheduled hours keyed by (instructor, meeting date, course prefix), one row per
+    key. Built once when the schedule is loaded; the bulk reconciliation engine
+    merge-joins timesheet entries against as_frame() instead of filtering the
+    whole schedule for every entry.
+    """
+
+    def __init__(self, frame):
+        self._frame = frame
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Build the index from a normalized ScheduleSnapshot.
+        """
+        occurrences = snapshot.occurrences
+        totals = occurrences.groupby(['instructor_key', 'date', 'course_key'], sort=False)['billed_hours'].sum()
+        return cls(pd.DataFrame({
+            "instructor": totals.index.get_level_values('instructor_key').to_numpy(dtype=object),
+            "date": pd.to_datetime(totals.index.get_level_values('date')),
+            "course": totals.index.get_level_values('course_key').to_numpy(dtype=object),
+            "scheduled_hours": totals.to_numpy(dtype='int64').astype(float),
+        }))
+
+    def as_frame(self):
+        """
+        The index as a DataFrame (instructor, date, course, scheduled_hours) for
+        merge-joins in the bulk reconciliation engine. Treat as read-only.
+        """
+        return self._frame
+
+    def __len__(self):
+        return len(self._frame)
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScheduleCache:
+    """
+    Columnar binary sidecars of parsed workbooks.
+
+    The first parse of a workbook sheet is written to a directory named after
+    the workbook's content hash, holding one .npy file per sheet column plus
+    the column names: dates as datetime64, numbers as their numeric dtype,
+    times of day as timedelta64 since midnight and text as fixed-width unicode.
+    Later loads memory-map each column file instead of parsing XLSX through
+    openpyxl; date and numeric columns are used straight from their mapping
+    without a copy. Sheets with a column mixing kinds of values (e.g. dates and
+    text) are not cached. Stale sidecars of the same workbook are removed.
+    """
+
+    # Bump when the sidecar layout changes so old files are ignored
+    FORMAT = 3
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, source, digest, sheet_name):
+        """
+        Sidecar directory for a workbook sheet with the given content hash.
+        """
+        key = hashlib.sha256(f"{digest}:{sheet_name}:{self.FORMAT}".encode('utf-8')).hexdigest()[:20]
+        return self.directory / f"{Path(source).stem}.{key}"
+
+    def load(self, source, digest, sheet_name):
+        """
+        The cached raw sheet as a DataFrame, or None when there is no sidecar.
+        """
+        path = self.path_for(source, digest, sheet_name)
+        if not path.is_dir():
+            return None
+        try:
+            names = json.loads((path / "columns.json").read_text(encoding='utf-8'))
+            columns = [np.load(path / f"{position}.npy", mmap_mode='r') for position in range(len(names))]
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable schedule cache {path}: {e}")
+            return None
+        frame = {}
+        for name, column in zip(names, columns):
+            if column.dtype.kind == 'U':
+                # Text has to become Python strings; '' marks an empty cell
+                frame[name] = pd.Series(column).replace('', np.nan)
+            else:
+                frame[name] = column
+        # copy=False keeps each typed column backed by its mapped file
+        return pd.DataFrame(frame, copy=False)
+
+    def store(self, source, digest, sheet_name, excel_data):
+        """
+        Write the raw sheet as a sidecar. Failures only skip caching.
+        """
+        path = self.path_for(source, digest, sheet_name)
+        columns = []
+        for name in excel_data.columns:
+            column = _typed_column(excel_data[name])
+            if column is None:
+                print(f"Not caching {Path(source).name}: column '{name}' mixes value types")
+                return
+            columns.append(column)
+
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temp_path.mkdir(parents=True, exist_ok=True)
+            for position, column in enumerate(columns):
+                np.save(temp_path / f"{position}.npy", column)
+            (temp_path / "columns.json").write_text(
+                json.dumps([str(name) for name in excel_data.columns]), encoding='utf-8',
+            )
+            # Publish the finished directory in one step; readers never see a partial sidecar
+            os.rename(temp_path, path)
+        except OSError as e:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            if not path.is_dir():
+                print(f"Could not write schedule cache {path}: {e}")
+                return
+        for stale in self.directory.glob(f"{Path(source).stem}.*"):
+            if stale == path or stale.name.endswith(".tmp"):
+                continue
+            if stale.is_dir():
+                shutil.rmtree(stale, ignore_errors=True)
+            else:
+                stale.unlink(missing_ok=True)
+
+
+def _typed_column(column):
+    """
+    A sheet column as a NumPy array for ScheduleCache, or None when its values
+    mix kinds and would not load back the way pd.read_excel() returns them.
+    """
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biufMm':
+        return column.to_numpy()
+
+    present = [value for value in column if not pd.isna(value)]
+    if all(isinstance(value, str) for value in present):
+        text = ['' if pd.isna(value) else value for value in column]
+        return np.array(text, dtype=f"U{max([len(value) for value in present] + [1])}")
+    if all(isinstance(value, time_of_day) for value in present):
+        return pd.to_timedelta(column.map(lambda value: None if pd.isna(value) else value.isoformat())).to_numpy()
+    if all(isinstance(value, datetime) for value in present):
+        return pd.to_datetime(column).to_numpy()
+    if all(isinstance(value, (int, float, np.number)) and not isinstance(value, bool) for value in present):
+        return pd.to_numeric(column).to_numpy(dtype=float)
+    return None
+
+
+class _LoadedSchedule:
+    """
+    A snapshot together with the file state it was built from.
+    """
+
+    def __init__(self, snapshot, mtime_ns, size, digest, source, load_seconds):
+        self.snapshot = snapshot
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.source = source  # 'xlsx' or 'cache'
+        self.load_seconds = load_seconds
+
+
+class ScheduleProvider:
+    """
+    Lazily loads term schedule workbooks (e.g. 'Sample_Fall 2024.xlsx',
+    'Sample_Winter 2025.xlsx') from a directory and caches one snapshot per term.
+
+    Every snapshot() call compares the workbook's mtime/size with the cached state;
+    when they change and the content hash differs, a new snapshot is fully built
+    (index included) and swapped in with a single assignment. Readers
+    never take a lock and always see either the old or the new snapshot.
+    """
+
+    def __init__(self, directory, default_term, pattern="*.xlsx", sheet_name='Activities - Groups', cache=None):
+        self.directory = Path(directory)
+        self.default_term = default_term
+        self.pattern = pattern
+        self.sheet_name = sheet_name
+        self.cache = cache
+        self._sources = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def terms(self):
+        """
+        Names of the available terms (workbook file names without extension).
+        """
+        self._discover()
+        return sorted(self._sources)
+
+    def path_for(self, term=None):
+        """
+        Workbook path of a term. Raises FileNotFoundError for unknown terms.
+        """
+        term = term or self.default_term
+        if term not in self._sources:
+            self._discover()
+        if term not in self._sources:
+            raise FileNotFoundError(f"No schedule found for term '{term}' in {self.directory}")
+        return self._sources[term]
+
+    def snapshot(self, term=None):
+        """
+        Current snapshot of a term (the default term when None), loading or
+        reloading the workbook when needed.
+        """
+        term = term or self.default_term
+        path = self.path_for(term)
+        stat = path.stat()
+        loaded = self._loaded.get(term)
+        if loaded and loaded.mtime_ns == stat.st_mtime_ns and loaded.size == stat.st_size:
+            return loaded.snapshot
+
+        with self._lock:
+            loaded = self._loaded.get(term)
+            stat = path.stat()
+            if loaded and loaded.mtime_ns == stat.st_mtime_ns and loaded.size == stat.st_size:
+                return loaded.snapshot
+
+            started = time.perf_counter()
+            digest = file_digest(path)
+            if loaded and loaded.digest == digest:
+                # Touched but unchanged: keep the snapshot, remember the new file state
+                snapshot, source = loaded.snapshot, loaded.source
+            else:
+                snapshot, source = self._build(path, digest)
+            load_seconds = time.perf_counter() - started
+            if snapshot is not (loaded and loaded.snapshot):
+                print(f"Loaded schedule for term '{term}' from {path.name} via {source} "
+                      f"in {load_seconds * 1000:.1f} ms ({len(snapshot)} classes)")
+            self._loaded = {
+                **self._loaded,
+                term: _LoadedSchedule(snapshot, stat.st_mtime_ns, stat.st_size, digest, source, load_seconds),
+            }
+            return snapshot
+
+    def load_stats(self):
+        """
+        How each loaded term was last built ('xlsx' or 'cache') and how long it took.
+        """
+        return {
+            term: {'source': loaded.source, 'load_seconds': loaded.load_seconds, 'digest': loaded.digest}
+            for term, loaded in self._loaded.items()
+        }
+
+    def _build(self, path, digest):
+        """
+        Parse a workbook (or its cached sidecar) into a snapshot with its index ready
+        to use. Returns (snapshot, source).
+        """
+        excel_data = self.cache.load(path, digest, self.sheet_name) if self.cache else None
+        source = 'cache'
+        if excel_data is None:
+            excel_data = pd.read_excel(path, sheet_name=self.sheet_name)
+            source = 'xlsx'
+            if self.cache:
+                self.cache.store(path, digest, self.sheet_name, excel_data)
+
+        snapshot = ScheduleSnapshot.from_excel(excel_data, version=digest)
+        snapshot.index
+        return snapshot, source
+
+    def _discover(self):
+        """
+        Rescan the directory for term workbooks, ignoring Excel lock files.
+        """
+        sources = {
+            path.stem: path
+            for path in sorted(self.directory.glob(self.pattern))
+            if not path.name.startswith("~$")
+        }
+        self._sources = sources
+
+
+if __name__ == "__main__":
+    # Compare a cold XLSX parse with a cached load: python schedule.py "static/Sample_Fall 2024.xlsx"
+    import sys
+    import tempfile
+
+    workbook = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).resolve().parent / "static" / "Sample_Fall 2024.xlsx")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for attempt in ("cold", "cached"):
+            provider = ScheduleProvider(workbook.parent, workbook.stem, pattern=workbook.name, cache=ScheduleCache(cache_dir))
+            provider.snapshot()
+            stats = provider.load_stats()[workbook.stem]
+            print(f"{attempt}: {stats['source']} {stats['load_seconds'] * 1000:.1f} ms")
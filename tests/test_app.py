@@ -0,0 +1,210 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+if mongomock:
+    import app
+    import user_store
+    from config import Config
+    import chatbot_final
+    from reconciliation import ReconciliationStore
+    from roster import FacultyRoster
+    from schedule import ScheduleProvider
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class AppTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        self.db.users.insert_many([
+            {'username': 'fin', 'role': 'Finance', 'password': b''},
+            {'username': 'Femi Johnson', 'role': 'Faculty'},
+        ])
+        patcher = mock.patch.multiple(
+            app,
+            db=self.db,
+            users=self.db.users,
+            reconciliation_store=ReconciliationStore(self.db),
+            storage_ready=threading.Event(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app.app.config['SECRET_KEY'] = 'test'
+
+    def client(self, username):
+        client = app.app.test_client()
+        with client.session_transaction() as session:
+            session['username'] = username
+        return client
+
+
+class TestRoleCache(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(app, 'role_versions', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_role_is_read_once_per_recheck_window(self):
+        with mock.patch.object(app, 'find_user', wraps=user_store.find_user) as find_user:
+            client = self.client('fin')
+            for _ in range(3):
+                self.assertEqual(client.get('/password_metrics').status_code, 200)
+        self.assertEqual(find_user.call_count, 1)
+
+    def test_role_change_here_applies_immediately(self):
+        finance, faculty = self.client('fin'), self.client('Femi Johnson')
+        self.assertEqual(faculty.get('/password_metrics').status_code, 403)
+        response = finance.post('/update_role', json={'username': 'Femi Johnson', 'role': 'Finance'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.db.users.find_one({'username': 'Femi Johnson'})['role_version'], 1)
+        self.assertEqual(faculty.get('/password_metrics').status_code, 200)
+
+        self.assertEqual(finance.post('/update_role', json={'username': 'fin', 'role': 'Faculty'}).status_code, 200)
+        self.assertEqual(finance.get('/password_metrics').status_code, 403)
+
+    def test_role_change_elsewhere_applies_after_the_recheck_window(self):
+        client = self.client('fin')
+        self.assertEqual(client.get('/password_metrics').status_code, 200)
+        # Changed by another process, which only this process's database reads can see
+        self.db.users.update_one({'username': 'fin'}, {'$set': {'role': 'Faculty'}, '$inc': {'role_version': 1}})
+        self.assertEqual(client.get('/password_metrics').status_code, 200)
+        with mock.patch.object(Config, 'ROLE_RECHECK_SECONDS', 0):
+            self.assertEqual(client.get('/password_metrics').status_code, 403)
+
+    def test_update_role_validates_its_input(self):
+        client = self.client('fin')
+        self.assertEqual(client.post('/update_role', json={'username': 'fin', 'role': 'Admin'}).status_code, 400)
+        self.assertEqual(client.post('/update_role', json={'username': 'nobody', 'role': 'Faculty'}).status_code, 404)
+        self.assertEqual(self.client('Femi Johnson').post('/update_role', json={'username': 'Femi Johnson', 'role': 'Finance'}).status_code, 403)
+
+
+class TestFinanceRoutes(AppTestCase):
+
+    def test_unknown_term_is_not_found(self):
+        client = self.client('fin')
+        self.assertEqual(client.get('/finance?term=Nope').status_code, 404)
+        self.assertEqual(client.get('/download_finance_report?term=Nope').status_code, 404)
+
+
+class TestSubmitTimesheet(AppTestCase):
+    ENTRY = {'date': '2024-09-06', 'day': 'Friday', 'course_code': 'SUST1002', 'hours_worked': '3'}
+
+    def submit(self, *entries):
+        return self.client('Femi Johnson').post('/submit_timesheet', json={'timesheet_data': list(entries)})
+
+    def test_submit_refreshes_built_terms(self):
+        self.assertEqual(self.client('fin').get('/finance').status_code, 200)
+        self.assertEqual(self.submit(self.ENTRY).status_code, 200)
+        rows = list(app.reconciliation_store.find_rows(Config.SCHEDULE_TERM))
+        self.assertEqual([(row['date'], row['hours_worked']) for row in rows], [('2024-09-06', 3.0)])
+
+    def test_term_without_a_workbook_is_dropped(self):
+        self.db.reconciliation_state.insert_one({'_id': 'Sample_Summer 2023', 'schedule_version': 'gone'})
+        self.assertEqual(self.submit(self.ENTRY).status_code, 200)
+        self.assertEqual(app.reconciliation_store.current_terms(), {})
+
+    def test_failed_refresh_keeps_the_saved_submit(self):
+        self.assertEqual(self.client('fin').get('/finance').status_code, 200)
+        with mock.patch.object(app.reconciliation_store, 'refresh', side_effect=RuntimeError('boom')):
+            self.assertEqual(self.submit(self.ENTRY).status_code, 200)
+        self.assertEqual(self.db.timesheet_entries.count_documents({}), 1)
+        # The rows are rebuilt, with the new entry, on the next read
+        self.assertEqual(app.reconciliation_store.current_terms(), {Config.SCHEDULE_TERM: None})
+        self.assertEqual(self.client('fin').get('/finance').status_code, 200)
+        self.assertEqual(len(list(app.reconciliation_store.find_rows(Config.SCHEDULE_TERM))), 1)
+
+
+    def test_out_of_window_claims_show_as_unscheduled(self):
+        self.assertEqual(self.client('fin').get('/finance').status_code, 200)
+        response = self.submit(self.ENTRY, dict(self.ENTRY, date='2025-01-10', hours_worked='9'))
+        self.assertEqual(response.status_code, 200)
+        rows = list(app.reconciliation_store.find_rows(Config.SCHEDULE_TERM))
+        self.assertEqual(
+            [(row['date'], row['scheduled'], row['matched']) for row in rows],
+            [('2024-09-06', True, False), ('2025-01-10', False, False)],
+        )
+        messages, = [
+            message for message in app.reconciliation_store.summary(Config.SCHEDULE_TERM)[1]
+            if '2025-01-10' in message
+        ]
+        self.assertIn('No schedule entry found', messages)
+
+    def test_other_terms_only_take_entries_within_their_dates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for term in (Config.SCHEDULE_TERM, 'Sample_Winter 2025'):
+                shutil.copy(app.schedule_dir / f'{Config.SCHEDULE_TERM}.xlsx', Path(directory) / f'{term}.xlsx')
+            with mock.patch.object(app, 'schedules', ScheduleProvider(directory, Config.SCHEDULE_TERM)):
+                self.db.timesheet_entries.insert_one({
+                    'username': 'Femi Johnson', 'date': '2025-01-10', 'day': 'Friday',
+                    'courseCode': 'SUST1002', 'hoursWorked': 9.0, 'comments': None,
+                })
+                client = self.client('fin')
+                self.assertEqual(client.get('/finance').status_code, 200)
+                self.assertEqual(client.get('/finance?term=Sample_Winter 2025').status_code, 200)
+                self.assertEqual(self.submit(self.ENTRY).status_code, 200)
+
+                dates = {
+                    term: [row['date'] for row in app.reconciliation_store.find_rows(term)]
+                    for term in app.reconciliation_store.current_terms()
+                }
+        self.assertEqual(dates, {
+            Config.SCHEDULE_TERM: ['2024-09-06', '2025-01-10'],
+            'Sample_Winter 2025': ['2024-09-06'],
+        })
+
+
+class TestChatbotRoster(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.db.users.insert_many([
+            {'username': name, 'username_lower': name.lower(), 'role': 'Faculty'}
+            for name in ['Ben Stiller', 'Bruce Wayne', 'Clark Kent']
+        ])
+        self.db.users.update_one({'username': 'Femi Johnson'}, {'$set': {'username_lower': 'femi johnson'}})
+        patcher = mock.patch.object(app, 'connect_db', lambda: self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(chatbot_final, '_roster', FacultyRoster(self.db, page_size=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.chat = app.app.test_client()
+
+    def ask(self, question):
+        return self.chat.post('/chatbot', json={'question': question}).get_json()['response']
+
+    def test_more_continues_the_listing(self):
+        self.assertEqual(
+            self.ask('list faculty'),
+            "List of Faculty Members:\nBen Stiller\nBruce Wayne\n...and 2 more. Ask 'more' for the next page.",
+        )
+        self.assertEqual(self.ask('more'), "List of Faculty Members:\nClark Kent\nFemi Johnson")
+        self.assertTrue(self.ask('more').startswith("No more faculty members"))
+
+    def test_faculty_starting_with(self):
+        self.assertEqual(
+            self.ask('Faculty starting with B'),
+            "List of Faculty Members:\nBen Stiller\nBruce Wayne",
+        )
+        self.assertEqual(self.ask("list faculty members beginning with 'cl'"), "List of Faculty Members:\nClark Kent")
+        self.assertEqual(self.ask('faculty starting with x'), "No faculty members found starting with 'x'.")
+
+    def test_more_pages_through_a_prefix(self):
+        self.db.users.insert_one({'username': 'Bob Parr', 'username_lower': 'bob parr', 'role': 'Faculty'})
+        self.assertTrue(self.ask('faculty starting with b').endswith("Ask 'more' for the next page."))
+        self.assertEqual(self.ask('more'), "List of Faculty Members:\nBruce Wayne")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from unittest import mock
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+import chatbot_final
+from chatbot_final import KeywordMatcher, ResultCache, execute_query, parse_user_question, route_question
+
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = KeywordMatcher()
+        for keyword in ["he", "she", "his", "hers"]:
+            self.matcher.add(keyword, keyword)
+        self.matcher.build()
+
+    def test_finds_overlapping_keywords(self):
+        self.assertEqual(self.matcher.find("ushers"), {"she", "he", "hers"})
+        self.assertEqual(self.matcher.find("this"), {"his"})
+
+    def test_no_match(self):
+        self.assertEqual(self.matcher.find("xyz"), set())
+        self.assertEqual(self.matcher.find(""), set())
+
+
+class TestRouteQuestion(unittest.TestCase):
+
+    def test_exact_questions(self):
+        self.assertEqual(route_question("List all faculty members"), ("list_faculty", "list_faculty"))
+
+    def test_total_hours_for_several_users(self):
+        intent, pipeline = route_question("What are the total hours for Femi Johnson, Ben Stiller?")
+        self.assertEqual(intent, "total_hours")
+        self.assertEqual(pipeline[0], {"$match": {"username_lower": {"$in": ["ben stiller", "femi johnson"]}}})
+
+    def test_courses_on_a_day(self):
+        intent, pipeline = route_question("Course code for Femi Johnson on Friday")
+        self.assertEqual(intent, "courses")
+        self.assertEqual(pipeline[1], {"$match": {"day": {"$regex": "^friday$", "$options": "i"}}})
+
+    def test_earlier_intent_wins_when_several_match(self):
+        self.assertEqual(route_question("total hours per course for Femi Johnson")[0], "total_hours")
+
+    def test_missing_username_and_unknown_question(self):
+        intent, reply = route_question("total hours")
+        self.assertEqual(intent, "total_hours")
+        self.assertTrue(reply.startswith("Error"))
+        self.assertEqual(route_question("what is the weather"), (None, "Error: Invalid question type."))
+        self.assertEqual(parse_user_question("how do I login"), "Refer to the documentation for instructions.")
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResultCache(max_entries=2, ttl_seconds=60)
+
+    def test_key_ignores_key_order(self):
+        self.assertEqual(ResultCache.key([{"$match": {"a": 1, "b": 2}}]), ResultCache.key([{"$match": {"b": 2, "a": 1}}]))
+
+    def test_invalidate_drops_only_that_users_results(self):
+        self.cache.put('femi', [1], ['Femi Johnson'])
+        self.cache.put('ben', [2], ['Ben Stiller'])
+        self.cache.invalidate_usernames(['FEMI JOHNSON'])
+        self.assertIsNone(self.cache.get('femi'))
+        self.assertEqual(self.cache.get('ben'), [2])
+
+    def test_untagged_results_are_dropped_on_every_write(self):
+        self.cache.put('all', [1])
+        self.cache.invalidate_usernames(['Ben Stiller'])
+        self.assertIsNone(self.cache.get('all'))
+
+    def test_expiry_and_eviction(self):
+        self.cache.put('a', [1], ['a'])
+        self.cache.put('b', [2], ['b'])
+        self.cache.get('a')
+        self.cache.put('c', [3], ['c'])
+        self.assertIsNone(self.cache.get('b'))
+        with mock.patch('chatbot_final.time.monotonic', return_value=chatbot_final.time.monotonic() + 61):
+            self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestExecuteQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        self.add('Femi Johnson', '2024-09-06')
+        self.add('Ben Stiller', '2024-09-10')
+        patcher = mock.patch.object(chatbot_final, 'result_cache', ResultCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add(self, username, date):
+        self.db.timesheet_entries.insert_one({'username': username, 'username_lower': username.lower(), 'date': date})
+
+    def last_date(self, username):
+        pipeline = route_question(f"end date for {username}")[1]
+        return execute_query(self.db, pipeline, [username])[0]['end_date']
+
+    def test_invalidation_drops_only_the_submitters_answers(self):
+        self.assertEqual(self.last_date('Femi Johnson'), '2024-09-06')
+        self.assertEqual(self.last_date('Ben Stiller'), '2024-09-10')
+        self.add('Femi Johnson', '2024-09-13')
+        self.add('Ben Stiller', '2024-09-17')
+
+        chatbot_final.result_cache.invalidate_usernames(['Femi Johnson'])
+        self.assertEqual(self.last_date('Femi Johnson'), '2024-09-13')
+        # Still served from the cache: nothing invalidated Ben Stiller's answer
+        self.assertEqual(self.last_date('Ben Stiller'), '2024-09-10')
+        self.assertEqual(chatbot_final.result_cache.stats()['hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
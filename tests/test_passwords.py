@@ -0,0 +1,53 @@
+import threading
+import unittest
+from unittest import mock
+
+import bcrypt
+
+from passwords import PasswordHasher, PasswordServiceBusy
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def setUp(self):
+        self.hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, wait_timeout=0.05)
+        self.addCleanup(self.hasher.shutdown)
+
+    def test_hash_and_verify(self):
+        hashed = self.hasher.hash('secret')
+        self.assertTrue(self.hasher.verify('secret', hashed))
+        self.assertFalse(self.hasher.verify('wrong', hashed))
+        metrics = self.hasher.metrics()
+        self.assertEqual((metrics['hash']['count'], metrics['verify']['count']), (1, 2))
+        self.assertEqual((metrics['queued'], metrics['running']), (0, 0))
+
+    def test_needs_rehash_when_the_cost_differs(self):
+        self.assertFalse(self.hasher.needs_rehash(bcrypt.hashpw(b'secret', bcrypt.gensalt(4))))
+        self.assertTrue(self.hasher.needs_rehash(bcrypt.hashpw(b'secret', bcrypt.gensalt(5))))
+        self.assertTrue(self.hasher.needs_rehash(b'not a bcrypt hash'))
+
+    def test_busy_when_no_slot_frees_up(self):
+        started, release = threading.Event(), threading.Event()
+        hashpw = bcrypt.hashpw
+
+        def slow_hashpw(password, salt):
+            started.set()
+            release.wait(5)
+            return hashpw(password, salt)
+
+        with mock.patch('passwords.bcrypt.hashpw', side_effect=slow_hashpw):
+            first = threading.Thread(target=self.hasher.hash, args=('secret',))
+            first.start()
+            self.assertTrue(started.wait(5))
+            with self.assertRaises(PasswordServiceBusy):
+                self.hasher.hash('other')
+            release.set()
+            first.join(5)
+
+        self.assertEqual(self.hasher.metrics()['rejected'], 1)
+        # The slot is free again once the first hash is done
+        self.assertTrue(self.hasher.verify('secret', self.hasher.hash('secret')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from datetime import time
+
+import pandas as pd
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from reconciliation import ReconciliationStore, entries_frame, iter_report_csv
+from schedule import ScheduleSnapshot
+
+TERM = 'Sample_Fall 2024'
+
+
+def snapshot(version='v1'):
+    """Femi Johnson teaches SUST1002 on Fridays, 12:00-15:00, in September 2024."""
+    sheet = pd.DataFrame({
+        'Group': ['G1'],
+        'Subject': ['SUST1002 - Sustainability & CSR'],
+        'Start Date': ['09/06/2024'],
+        'End Date': ['09/27/2024'],
+        'Start Time': [time(12, 0)],
+        'End Time': [time(15, 0)],
+        'Days of the Week': ['F'],
+        'Room': ['Room 108'],
+        'Instructor': ['Femi Johnson'],
+    })
+    return ScheduleSnapshot.from_excel(sheet, version=version)
+
+
+def entries(*rows):
+    return entries_frame(('Femi Johnson', '✗', date, 'Friday', 'SUST1002', hours, None) for date, hours in rows)
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestReconciliationStore(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        self.store = ReconciliationStore(self.db)
+        self.snapshot = snapshot()
+
+    def rows(self):
+        return [(row['date'], row['hours_worked'], row['matched']) for row in self.store.find_rows(TERM)]
+
+    def test_rebuild_materializes_rows(self):
+        self.assertTrue(self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0), ('2024-09-13', 2.0))))
+        self.assertEqual(self.rows(), [('2024-09-06', 3.0, True), ('2024-09-13', 2.0, False)])
+        self.assertTrue(self.store.is_current(TERM, 'v1'))
+        self.assertEqual(self.store.current_terms(), {TERM: 'v1'})
+
+    def test_rebuild_replaces_the_previous_build(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+        self.store.rebuild(TERM, snapshot('v2'), entries(('2024-09-13', 3.0)))
+        self.assertEqual(self.rows(), [('2024-09-13', 3.0, True)])
+        self.assertEqual(self.db.faculty_reconciliation.count_documents({}), 1)
+
+    def test_concurrent_rebuild_loses_the_swap(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+        stale_build = self.store.current_build(TERM)
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-13', 3.0)))
+
+        # A rebuild that read the state before the one above swapped in its rows
+        self.store.current_build = lambda term: stale_build
+        self.assertFalse(self.store.rebuild(TERM, self.snapshot, entries(('2024-09-20', 3.0))))
+        del self.store.current_build
+
+        self.assertEqual(self.rows(), [('2024-09-13', 3.0, True)])
+        self.assertEqual(self.db.faculty_reconciliation.count_documents({}), 1)
+
+    def test_refresh_replaces_only_the_given_keys(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0), ('2024-09-13', 2.0)))
+        self.store.refresh(TERM, self.snapshot, 'Femi Johnson', entries(('2024-09-13', 3.0)), [('2024-09-13', 'SUST1002')])
+        self.assertEqual(self.rows(), [('2024-09-06', 3.0, True), ('2024-09-13', 3.0, True)])
+
+    def test_refresh_follows_a_rebuild_that_swapped_in_meanwhile(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+        bulk_write = self.store.rows.bulk_write
+
+        def rebuild_after_write(requests, ordered=True):
+            result = bulk_write(requests, ordered=ordered)
+            # A rebuild that loaded the entries before the refreshed one was saved
+            self.store.rows.bulk_write = bulk_write
+            self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+            return result
+
+        self.store.rows.bulk_write = rebuild_after_write
+        self.assertTrue(self.store.refresh(
+            TERM, self.snapshot, 'Femi Johnson', entries(('2024-09-13', 3.0)), [('2024-09-13', 'SUST1002')],
+        ))
+        self.assertEqual(self.rows(), [('2024-09-06', 3.0, True), ('2024-09-13', 3.0, True)])
+        self.assertEqual(self.db.faculty_reconciliation.count_documents({}), 2)
+
+    def test_refresh_skips_rows_of_another_schedule_version(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+        self.assertFalse(self.store.refresh(
+            TERM, snapshot('v2'), 'Femi Johnson', entries(('2024-09-13', 3.0)), [('2024-09-13', 'SUST1002')],
+        ))
+        self.assertEqual(self.rows(), [('2024-09-06', 3.0, True)])
+
+    def test_expire_and_drop_term(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0)))
+        self.store.expire()
+        self.assertFalse(self.store.is_current(TERM, 'v1'))
+        self.assertEqual(self.rows(), [('2024-09-06', 3.0, True)])
+
+        self.store.drop_term(TERM)
+        self.assertEqual(self.store.current_terms(), {})
+        self.assertEqual(self.db.faculty_reconciliation.count_documents({}), 0)
+
+
+    def test_set_status_reaches_the_report(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-13', 2.0)))
+        self.store.set_status('Femi Johnson', '✓')
+        report = ''.join(iter_report_csv(self.store.find_rows(TERM))).splitlines()
+        self.assertEqual(report[0], 'Faculty Name,Date,Course Code,Hours Worked,Scheduled Hours,Delta,Approval,Status')
+        self.assertEqual(report[1], 'Femi Johnson,2024-09-13,SUST1002,2,3,-1,Approved,Hours Matched')
+
+    def test_report_streams_in_batches(self):
+        self.store.rebuild(TERM, self.snapshot, entries(('2024-09-06', 3.0), ('2024-09-13', 2.0), ('2024-09-20', 3.0)))
+        chunks = list(iter_report_csv(self.store.find_rows(TERM), batch_size=2))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(len(''.join(chunks).splitlines()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from roster import FacultyRoster
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestFacultyRoster(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        names = ['Ben Stiller', 'alice Smith', 'Clark Kent', 'Femi Johnson', 'Bruce Wayne']
+        self.db.users.insert_many([{'username': name, 'username_lower': name.lower(), 'role': 'Faculty'} for name in names])
+        self.db.users.insert_one({'username': 'fin', 'username_lower': 'fin', 'role': 'Finance'})
+        self.roster = FacultyRoster(self.db, page_size=2)
+
+    def pages(self, prefix=None):
+        pages = []
+        after = None
+        while True:
+            usernames, after = self.roster.page(after, prefix)
+            pages.append(usernames)
+            if after is None:
+                return pages
+
+    def test_pages_follow_the_cursor(self):
+        self.assertEqual(self.pages(), [['alice Smith', 'Ben Stiller'], ['Bruce Wayne', 'Clark Kent'], ['Femi Johnson']])
+
+    def test_names_differing_only_in_case_are_not_skipped(self):
+        self.db.users.insert_many([
+            {'username': name, 'username_lower': name.lower(), 'role': 'Faculty'}
+            for name in ['BEN STILLER', 'ben stiller']
+        ])
+        usernames = sum(self.pages(prefix='ben'), [])
+        self.assertEqual(sorted(usernames), ['BEN STILLER', 'Ben Stiller', 'ben stiller'])
+
+    def test_prefix_is_case_insensitive(self):
+        self.assertEqual(self.roster.page(prefix='B', limit=5), (['Ben Stiller', 'Bruce Wayne'], None))
+
+    def test_snapshot_is_cached_until_invalidated(self):
+        usernames, after, total = self.roster.snapshot()
+        self.assertEqual((usernames, total), (['alice Smith', 'Ben Stiller'], 5))
+        self.assertEqual(self.roster.page(after)[0], ['Bruce Wayne', 'Clark Kent'])
+        self.db.users.insert_one({'username': 'Aaron Ames', 'username_lower': 'aaron ames', 'role': 'Faculty'})
+        self.assertEqual(self.roster.snapshot()[2], 5)
+        self.roster.invalidate()
+        self.assertEqual(self.roster.snapshot()[::2], (['Aaron Ames', 'alice Smith'], 6))
+
+    def test_users_without_username_lower_are_listed_first(self):
+        self.db.users.insert_many([
+            {'username': name, 'role': 'Faculty'} for name in ['Zed Added', 'Amy Added', 'Kim Added']
+        ])
+        usernames = sum(self.pages(), [])
+        self.assertEqual(usernames[:3], ['Zed Added', 'Amy Added', 'Kim Added'])
+        self.assertEqual(len(usernames), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
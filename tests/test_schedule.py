@@ -0,0 +1,207 @@
+import os
+import tempfile
+import unittest
+from datetime import date, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schedule import ScheduleCache, ScheduleProvider, ScheduleSnapshot, file_digest, meeting_dates, parse_days_of_week
+
+
+def sheet(rows):
+    """An 'Activities - Groups' sheet from (subject, start, end, from, to, days, instructor) rows."""
+    columns = ['Subject', 'Start Date', 'End Date', 'Start Time', 'End Time', 'Days of the Week', 'Instructor']
+    frame = pd.DataFrame(rows, columns=columns)
+    frame.insert(0, 'Group', 'G1')
+    frame['Room'] = 'Room 108'
+    return frame
+
+
+class TestParseDaysOfWeek(unittest.TestCase):
+    def test_single_day(self):
+        self.assertEqual(parse_days_of_week('F'), [4])
+        self.assertEqual(parse_days_of_week('Th'), [3])
+
+    def test_comma_separated(self):
+        self.assertEqual(parse_days_of_week('M,W'), [0, 2])
+        self.assertEqual(parse_days_of_week('T, Th'), [1, 3])
+
+    def test_run_together(self):
+        self.assertEqual(parse_days_of_week('TTh'), [1, 3])
+        self.assertEqual(parse_days_of_week('MWF'), [0, 2, 4])
+
+    def test_unknown_abbreviation(self):
+        for days in ['', 'X', 'M,Q', 'Monday']:
+            with self.assertRaises(ValueError):
+                parse_days_of_week(days)
+
+
+class TestMeetingDates(unittest.TestCase):
+    def test_single_weekday(self):
+        # 2024-09-05 and 2024-09-12 are Thursdays
+        dates = meeting_dates(date(2024, 9, 1), date(2024, 9, 14), parse_days_of_week('Th'))
+        self.assertEqual(dates.tolist(), [date(2024, 9, 5), date(2024, 9, 12)])
+
+    def test_several_weekdays(self):
+        dates = meeting_dates(date(2024, 9, 2), date(2024, 9, 8), parse_days_of_week('M,W'))
+        self.assertEqual(dates.tolist(), [date(2024, 9, 2), date(2024, 9, 4)])
+
+        dates = meeting_dates(date(2024, 9, 2), date(2024, 9, 8), parse_days_of_week('T, Th'))
+        self.assertEqual(dates.tolist(), [date(2024, 9, 3), date(2024, 9, 5)])
+
+    def test_range_is_inclusive(self):
+        dates = meeting_dates(date(2024, 9, 6), date(2024, 9, 6), parse_days_of_week('F'))
+        self.assertEqual(dates.tolist(), [date(2024, 9, 6)])
+        self.assertEqual(dates.dtype, np.dtype('datetime64[D]'))
+
+    def test_no_meeting_in_range(self):
+        dates = meeting_dates(date(2024, 9, 2), date(2024, 9, 4), parse_days_of_week('F'))
+        self.assertEqual(len(dates), 0)
+
+
+class TestScheduleIndex(unittest.TestCase):
+    def hours(self, snapshot):
+        frame = snapshot.index.as_frame()
+        return {
+            (row.instructor, row.date.date(), row.course): row.scheduled_hours
+            for row in frame.itertuples()
+        }
+
+    def test_multi_day_class_has_hours_on_every_meeting(self):
+        snapshot = ScheduleSnapshot.from_excel(sheet([
+            ['GBMG1001 - Management', '09/02/2024', '09/11/2024', time(9, 0), time(12, 0), 'M,W', 'Ben Stiller'],
+        ]))
+        self.assertEqual(self.hours(snapshot), {
+            ('ben stiller', date(2024, 9, 2), 'gbmg1001'): 3.0,
+            ('ben stiller', date(2024, 9, 4), 'gbmg1001'): 3.0,
+            ('ben stiller', date(2024, 9, 9), 'gbmg1001'): 3.0,
+            ('ben stiller', date(2024, 9, 11), 'gbmg1001'): 3.0,
+        })
+
+    def test_classes_on_the_same_day_are_summed(self):
+        snapshot = ScheduleSnapshot.from_excel(sheet([
+            ['SUST1002 - Sustainability', '09/03/2024', '09/03/2024', time(9, 0), time(11, 0), 'T, Th', 'Femi Johnson'],
+            ['SUST1002 - Sustainability', '09/03/2024', '09/05/2024', time(13, 0), time(16, 0), 'T', 'Femi Johnson'],
+            ['SUST1002 - Sustainability', '09/03/2024', '09/05/2024', time(9, 0), time(10, 0), 'Th', 'Femi Johnson'],
+        ]))
+        self.assertEqual(self.hours(snapshot), {
+            ('femi johnson', date(2024, 9, 3), 'sust1002'): 5.0,
+            ('femi johnson', date(2024, 9, 5), 'sust1002'): 1.0,
+        })
+        self.assertEqual(len(snapshot.index), 2)
+
+    def test_unknown_meeting_pattern_is_skipped(self):
+        snapshot = ScheduleSnapshot.from_excel(sheet([
+            ['SUST1002 - Sustainability', '09/06/2024', '09/06/2024', time(12, 0), time(15, 0), 'TBA', 'Femi Johnson'],
+        ]))
+        self.assertEqual(len(snapshot.index), 0)
+
+
+class TestScheduleCache(unittest.TestCase):
+    SHEET = 'Activities - Groups'
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.workbook = Path(self.directory.name) / 'Sample_Fall 2024.xlsx'
+        data = sheet([
+            ['SUST1002 - Sustainability', '09/06/2024', '09/27/2024', time(12, 0), time(15, 0), 'F', 'Femi Johnson'],
+            ['GBMG1001 - Management', '09/02/2024', '09/11/2024', time(9, 30), time(12, 0), 'M,W', 'Ben Stiller'],
+            ['GBMG1001 - Management', '09/03/2024', '09/03/2024', time(9, 0), time(10, 0), 'T', None],
+        ])
+        data['Capacity'] = [30, 25.5, None]
+        data.to_excel(self.workbook, sheet_name=self.SHEET, index=False)
+        self.cache = ScheduleCache(Path(self.directory.name) / 'cache')
+
+    def test_round_trip_matches_the_xlsx_parse(self):
+        parsed = pd.read_excel(self.workbook, sheet_name=self.SHEET)
+        digest = file_digest(self.workbook)
+        self.assertIsNone(self.cache.load(self.workbook, digest, self.SHEET))
+
+        self.cache.store(self.workbook, digest, self.SHEET, parsed)
+        cached = self.cache.load(self.workbook, digest, self.SHEET)
+
+        self.assertEqual(list(cached.columns), list(parsed.columns))
+        pd.testing.assert_series_equal(cached['Capacity'], parsed['Capacity'])
+        pd.testing.assert_series_equal(cached['Instructor'], parsed['Instructor'])
+        from_xlsx = ScheduleSnapshot.from_excel(parsed)
+        from_cache = ScheduleSnapshot.from_excel(cached)
+        pd.testing.assert_frame_equal(from_cache.frame, from_xlsx.frame)
+        pd.testing.assert_frame_equal(from_cache.index.as_frame(), from_xlsx.index.as_frame())
+
+    def test_one_file_per_column(self):
+        parsed = pd.read_excel(self.workbook, sheet_name=self.SHEET)
+        digest = file_digest(self.workbook)
+        self.cache.store(self.workbook, digest, self.SHEET, parsed)
+
+        path = self.cache.path_for(self.workbook, digest, self.SHEET)
+        self.assertEqual(len(list(path.glob('*.npy'))), len(parsed.columns))
+        self.assertIsInstance(np.load(path / '8.npy', mmap_mode='r'), np.memmap)
+
+    def test_store_removes_stale_sidecars(self):
+        parsed = pd.read_excel(self.workbook, sheet_name=self.SHEET)
+        self.cache.store(self.workbook, 'old', self.SHEET, parsed)
+        self.cache.store(self.workbook, 'new', self.SHEET, parsed)
+
+        self.assertEqual(
+            [path.name for path in self.cache.directory.iterdir()],
+            [self.cache.path_for(self.workbook, 'new', self.SHEET).name],
+        )
+        self.assertIsNone(self.cache.load(self.workbook, 'old', self.SHEET))
+
+    def test_mixed_column_is_not_cached(self):
+        parsed = pd.read_excel(self.workbook, sheet_name=self.SHEET)
+        parsed['Room'] = ['Room 108', 5, None]
+        self.cache.store(self.workbook, 'mixed', self.SHEET, parsed)
+        self.assertIsNone(self.cache.load(self.workbook, 'mixed', self.SHEET))
+
+
+class TestScheduleProvider(unittest.TestCase):
+    TERM = 'Sample_Fall 2024'
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.workbook = Path(self.directory.name) / f'{self.TERM}.xlsx'
+        self.provider = ScheduleProvider(self.directory.name, self.TERM)
+
+    def write(self, path, instructor, mtime):
+        sheet([
+            ['SUST1002 - Sustainability', '09/06/2024', '09/27/2024', time(12, 0), time(15, 0), 'F', instructor],
+        ]).to_excel(path, sheet_name='Activities - Groups', index=False)
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_reloads_when_the_workbook_changes(self):
+        self.write(self.workbook, 'Femi Johnson', 1_000_000_000)
+        first = self.provider.snapshot()
+        self.assertIs(self.provider.snapshot(), first)
+
+        self.write(self.workbook, 'Ben Stiller', 2_000_000_000)
+        second = self.provider.snapshot()
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.version, first.version)
+        self.assertEqual(second.frame['instructor_key'].tolist(), ['ben stiller'])
+
+    def test_touched_but_unchanged_keeps_the_snapshot(self):
+        self.write(self.workbook, 'Femi Johnson', 1_000_000_000)
+        first = self.provider.snapshot()
+        os.utime(self.workbook, ns=(2_000_000_000, 2_000_000_000))
+        self.assertIs(self.provider.snapshot(), first)
+
+    def test_terms_are_discovered(self):
+        self.write(self.workbook, 'Femi Johnson', 1_000_000_000)
+        self.assertEqual(self.provider.terms(), [self.TERM])
+        self.write(Path(self.directory.name) / 'Sample_Winter 2025.xlsx', 'Ben Stiller', 1_000_000_000)
+        self.assertEqual(len(self.provider.snapshot('Sample_Winter 2025')), 1)
+        self.assertEqual(self.provider.terms(), [self.TERM, 'Sample_Winter 2025'])
+
+    def test_unknown_term(self):
+        self.write(self.workbook, 'Femi Johnson', 1_000_000_000)
+        with self.assertRaises(FileNotFoundError):
+            self.provider.snapshot('Nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from timesheet_store import ENTRIES_COLLECTION, MIGRATION_NAME, entry_document, find_existing_entries, init_timesheet_storage, save_entries
+from user_store import backfill_username_lower, init_user_storage
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestTimesheetMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        self.db.users.insert_many([
+            {'username': 'Femi Johnson', 'role': 'Faculty', 'timesheets': [
+                {'week1': [{'date': '2024-09-06', 'day': 'Friday', 'courseCode': 'SUST1002', 'hoursWorked': 3.0, 'comments': ''}]},
+                {'week1': [{'date': '2024-09-06', 'day': 'Friday', 'courseCode': 'SUST1002', 'hoursWorked': 6.0, 'comments': 'resubmitted'}],
+                 'week2': [{'date': '2024-09-13', 'day': 'Friday', 'courseCode': 'SUST1002', 'hoursWorked': 6.0, 'comments': None}]},
+            ]},
+            {'username': 'fin', 'role': 'Finance'},
+        ])
+
+    def test_nested_entries_move_to_timesheet_entries(self):
+        init_timesheet_storage(self.db)
+        entries = list(self.db[ENTRIES_COLLECTION].find({}, {'_id': 0}).sort('date', 1))
+        self.assertEqual([(entry['date'], entry['hoursWorked']) for entry in entries], [('2024-09-06', 6.0), ('2024-09-13', 6.0)])
+        self.assertEqual({entry['username_lower'] for entry in entries}, {'femi johnson'})
+        self.assertIsNone(self.db.users.find_one({'timesheets': {'$exists': True}}))
+        self.assertIsNotNone(self.db.migrations.find_one({'name': MIGRATION_NAME}))
+
+    def test_migration_runs_once(self):
+        init_timesheet_storage(self.db)
+        self.db.users.update_one({'username': 'fin'}, {'$set': {'timesheets': [{'week1': [
+            {'date': '2024-09-10', 'day': 'Tuesday', 'courseCode': 'GBMG1001', 'hoursWorked': 3.0}]}]}})
+        init_timesheet_storage(self.db)
+        self.assertEqual(self.db[ENTRIES_COLLECTION].count_documents({}), 2)
+
+    def test_save_entries_upserts_by_key(self):
+        init_timesheet_storage(self.db)
+        save_entries(self.db, [entry_document('Femi Johnson', '2024-09-13', 'Friday', 'SUST1002', 4.0, 'corrected')])
+        existing = find_existing_entries(self.db, [entry_document('Femi Johnson', '2024-09-13', 'Friday', 'SUST1002', 0, None)])
+        self.assertEqual(existing[('2024-09-13', 'SUST1002')]['hoursWorked'], 4.0)
+        self.assertEqual(self.db[ENTRIES_COLLECTION].count_documents({}), 2)
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestUsernameLowerBackfill(unittest.TestCase):
+
+    def setUp(self):
+        self.db = mongomock.MongoClient()['loginDB']
+        self.db.users.insert_many([{'username': 'Femi Johnson'}, {'username': 'Ben Stiller', 'username_lower': 'ben stiller'}, {'role': 'Faculty'}])
+        self.db[ENTRIES_COLLECTION].insert_one({'username': 'Femi Johnson', 'date': '2024-09-06', 'courseCode': 'SUST1002'})
+
+    def test_backfill_sets_missing_values_in_batches(self):
+        self.assertEqual(backfill_username_lower(self.db.users, batch_size=1), 1)
+        self.assertEqual(self.db.users.find_one({'username': 'Femi Johnson'})['username_lower'], 'femi johnson')
+        self.assertNotIn('username_lower', self.db.users.find_one({'role': 'Faculty'}))
+
+    def test_init_user_storage_backfills_on_every_start(self):
+        init_user_storage(self.db)
+        self.assertEqual(self.db[ENTRIES_COLLECTION].find_one()['username_lower'], 'femi johnson')
+
+        # Written later without username_lower, e.g. by hand
+        self.db.users.insert_one({'username': 'New Faculty'})
+        init_user_storage(self.db)
+        self.assertEqual(self.db.users.find_one({'username': 'New Faculty'})['username_lower'], 'new faculty')
+
+
+if __name__ == '__main__':
+    unittest.main()
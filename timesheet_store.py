@@ -0,0 +1,135 @@
+from pymongo import ASCENDING, UpdateOne
+
+# Collection holding one document per (faculty, date, course) timesheet entry
+ENTRIES_COLLECTION = "timesheet_entries"
+
+# Name under which the nested -> normalized migration is recorded in db.migrations
+MIGRATION_NAME = "timesheet_entries_from_nested"
+
+# Fields of an entry document besides the _id
+ENTRY_FIELDS = ['username', 'username_lower', 'date', 'day', 'courseCode', 'hoursWorked', 'comments']
+
+
+def ensure_indexes(db):
+    """
+    Compound indexes for the timesheet_entries collection.
+    """
+    entries = db[ENTRIES_COLLECTION]
+    # One entry per faculty member, date and course; also serves per-user reads sorted by date
+    entries.create_index(
+        [('username', ASCENDING), ('date', ASCENDING), ('courseCode', ASCENDING)],
+        unique=True,
+        name='username_date_course',
+    )
+    # Date-range reads across all faculty (finance pay periods)
+    entries.create_index([('date', ASCENDING), ('username', ASCENDING)], name='date_username')
+    # Case-insensitive lookups by name (chatbot) as exact matches on the lowercase copy
+    entries.create_index([('username_lower', ASCENDING), ('date', ASCENDING)], name='username_lower_date')
+
+
+def entry_document(username, date, day, course_code, hours_worked, comments):
+    """
+    A timesheet_entries document in the field naming the nested layout used.
+    """
+    return {
+        'username': username,
+        'username_lower': username.lower(),
+        'date': date,
+        'day': day,
+        'courseCode': course_code,
+        'hoursWorked': hours_worked,
+        'comments': comments,
+    }
+
+
+def entry_key(entry):
+    """
+    Unique key filter of an entry document.
+    """
+    return {'username': entry['username'], 'date': entry['date'], 'courseCode': entry['courseCode']}
+
+
+def find_existing_entries(db, entries):
+    """
+    Stored entries matching any of the given entries' keys, fetched in one query
+    and keyed by (date, courseCode). All entries must belong to the same user.
+    """
+    if not entries:
+        return {}
+    query = {
+        'username': entries[0]['username'],
+        '$or': [{'date': entry['date'], 'courseCode': entry['courseCode']} for entry in entries],
+    }
+    projection = {'_id': 0, 'date': 1, 'courseCode': 1, 'hoursWorked': 1}
+    return {(entry['date'], entry['courseCode']): entry for entry in db[ENTRIES_COLLECTION].find(query, projection)}
+
+
+def save_entries(db, entries):
+    """
+    Upsert entries with one ordered bulk write; a later entry with the same key wins.
+    """
+    if not entries:
+        return None
+    requests = [UpdateOne(entry_key(entry), {'$set': entry}, upsert=True) for entry in entries]
+    return db[ENTRIES_COLLECTION].bulk_write(requests, ordered=True)
+
+
+def find_entries(db, username, projection=None):
+    """
+    A faculty member's entries, oldest first.
+    """
+    if projection is None:
+        projection = {'_id': 0}
+    return db[ENTRIES_COLLECTION].find({'username': username}, projection).sort([('date', ASCENDING), ('courseCode', ASCENDING)])
+
+
+def as_legacy_timesheets(entries):
+    """
+    Wrap entries in the old [{'week1': [entry]}] layout that the faculty page's script expects.
+    """
+    return [
+        {'week1': [{field: entry.get(field) for field in ENTRY_FIELDS if field not in ('username', 'username_lower')}]}
+        for entry in entries
+    ]
+
+
+def migrate_nested_timesheets(db):
+    """
+    Move entries from users.timesheets[].week1/week2 into timesheet_entries and
+    drop the nested arrays, so user documents stay small. Later duplicates of the
+    same (faculty, date, course) win, like a resubmission would. Safe to re-run.
+    Returns the number of users migrated.
+    """
+    users = db['users']
+    entries = db[ENTRIES_COLLECTION]
+    migrated = 0
+    for user in users.find({'timesheets': {'$exists': True}}, {'username': 1, 'timesheets': 1}):
+        requests = []
+        for timesheet in user.get('timesheets') or []:
+            for week in ['week1', 'week2']:
+                for entry in timesheet.get(week, []):
+                    document = entry_document(
+                        user['username'],
+                        entry.get('date'),
+                        entry.get('day'),
+                        entry.get('courseCode'),
+                        entry.get('hoursWorked'),
+                        entry.get('comments'),
+                    )
+                    requests.append(UpdateOne(entry_key(document), {'$set': document}, upsert=True))
+        if requests:
+            entries.bulk_write(requests, ordered=True)
+        users.update_one({'_id': user['_id']}, {'$unset': {'timesheets': ""}})
+        migrated += 1
+    return migrated
+
+
+def init_timesheet_storage(db):
+    """
+    Create indexes and run the nested-layout migration once per database.
+    """
+    ensure_indexes(db)
+    if not db.migrations.find_one({"name": MIGRATION_NAME}):
+        migrated = migrate_nested_timesheets(db)
+        db.migrations.insert_one({"name": MIGRATION_NAME})
+        print(f"Migrated timesheets of {migrated} users into {ENTRIES_COLLECTION}.")
@@ -0,0 +1,70 @@
+from pymongo import ASCENDING, UpdateOne
+from timesheet_store import ENTRIES_COLLECTION
+
+# Named projections, so each read only transfers and decodes the fields it uses.
+# Login: credentials plus the role cached in the session
+AUTH_PROJECTION = {'_id': 0, 'username': 1, 'password': 1, 'role': 1, 'role_version': 1}
+# Periodic role re-checks of a logged-in user
+ROLE_PROJECTION = {'_id': 0, 'role': 1, 'role_version': 1}
+# Faculty listings and finance approval state
+ROSTER_PROJECTION = {'_id': 0, 'username': 1, 'status': 1}
+# timesheet_entries documents without their _id
+TIMESHEET_PROJECTION = {'_id': 0, 'username': 1, 'date': 1, 'day': 1, 'courseCode': 1, 'hoursWorked': 1, 'comments': 1}
+
+
+def find_user(db, username, projection=AUTH_PROJECTION):
+    """
+    One user document limited to the given projection, or None.
+    """
+    return db['users'].find_one({'username': username}, projection)
+
+
+def user_exists(db, username):
+    """
+    True when a user with this username exists; only the _id is returned.
+    """
+    return db['users'].find_one({'username': username}, {'_id': 1}) is not None
+
+
+def find_faculty_member(db, username, projection=ROSTER_PROJECTION):
+    """
+    One faculty member's document, or None if the user is not faculty.
+    """
+    return db['users'].find_one({'role': 'Faculty', 'username': username}, projection)
+
+
+def ensure_indexes(db):
+    """
+    Index for exact, case-insensitive username lookups on users.
+    """
+    db['users'].create_index([('username_lower', ASCENDING)], name='username_lower')
+
+
+def backfill_username_lower(collection, batch_size=1000):
+    """
+    Set username_lower on documents that lack it, in batched bulk writes.
+    Returns the number of documents updated.
+    """
+    updated = 0
+    requests = []
+    for document in collection.find({'username_lower': {'$exists': False}, 'username': {'$type': 'string'}}, {'username': 1}):
+        requests.append(UpdateOne({'_id': document['_id']}, {'$set': {'username_lower': document['username'].lower()}}))
+        if len(requests) == batch_size:
+            updated += collection.bulk_write(requests, ordered=False).modified_count
+            requests = []
+    if requests:
+        updated += collection.bulk_write(requests, ordered=False).modified_count
+    return updated
+
+
+def init_user_storage(db):
+    """
+    Create the users index and backfill username_lower on users and
+    timesheet_entries. Runs at every process start, so documents written
+    without username_lower since (e.g. users added by hand) are picked up.
+    """
+    ensure_indexes(db)
+    users = backfill_username_lower(db['users'])
+    entries = backfill_username_lower(db[ENTRIES_COLLECTION])
+    if users or entries:
+        print(f"Backfilled username_lower on {users} users and {entries} timesheet entries.")